@@ -0,0 +1,139 @@
+"""
+Per-endpoint latency benchmark for the API. Seeds Mongo (or mongomock)
+with scale x one school year of synthetic data, serves the Flask app
+in-process on a threaded server, drives each endpoint at the given
+concurrency, and reports throughput, p50/p95/p99 and payload size with
+and without gzip. Results are written as JSON; pass --compare with an
+earlier file to flag regressions.
+
+    python benchmarks/api_latency.py [--scale 1] [--concurrency 16] [--duration 10]
+        [--mongodb-url mongodb://localhost:27017/northside_bench] [--cache]
+        [--output results/api.json] [--compare results/previous.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from seed import BACKEND_DIR, connect, seed, volumes
+from load import run_load
+
+ENDPOINTS = {
+    'home': '/api/home',
+    'roster': '/api/roster',
+    'roster_filtered': '/api/roster?sport=soccer&gender=girls&level=varsity',
+    'schedule_athletics': '/api/schedule/athletics',
+    'schedule_athletics_range': '/api/schedule/athletics?sport=soccer&from={today}&to={month}',
+    'schedule_general': '/api/schedule/general',
+    'announcements': '/api/announcements',
+}
+# Fractional change in p95 or throughput that counts as a regression
+REGRESSION_THRESHOLD = float(os.environ.get('BENCHMARK_REGRESSION_THRESHOLD', 0.2))
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def serve(app, port):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', port, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def payload_sizes(base_url, path):
+    import urllib.request
+
+    sizes = {}
+    for encoding in ['identity', 'gzip']:
+        request = urllib.request.Request(base_url + path, headers={'Accept-Encoding': encoding})
+        with urllib.request.urlopen(request) as response:
+            sizes[encoding] = len(response.read())
+    return sizes
+
+def compare(results, previous_path):
+    with open(previous_path) as file:
+        previous = json.load(file)['endpoints']
+    regressions = []
+    for name, result in results.items():
+        before = previous.get(name)
+        if not before or not before.get('p95_ms') or not before.get('throughput'):
+            continue
+        if result['p95_ms'] > before['p95_ms'] * (1 + REGRESSION_THRESHOLD):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.1f}ms -> {result['p95_ms']:.1f}ms")
+        if result['throughput'] < before['throughput'] * (1 - REGRESSION_THRESHOLD):
+            regressions.append(f"{name}: throughput {before['throughput']:.1f} -> {result['throughput']:.1f} req/s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0, help='multiple of one school year of data')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10, help='seconds per endpoint')
+    parser.add_argument('--port', type=int, default=18100)
+    parser.add_argument('--mongodb-url', help='seed and query this server instead of mongomock')
+    parser.add_argument('--cache', action='store_true', help='leave the per-worker response cache on')
+    parser.add_argument('--output', default=os.path.join(BACKEND_DIR, 'benchmarks', 'results', f"api-{datetime.now():%Y%m%d-%H%M%S}.json"))
+    parser.add_argument('--compare', help='earlier results file; exits non-zero on regressions')
+    args = parser.parse_args()
+
+    backend = connect(args.mongodb_url)
+    counts = volumes(args.scale)
+    seed(counts)
+
+    import main as api
+    import response_cache
+    response_cache.CACHE_ENABLED = args.cache
+
+    server = serve(api.app, args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    today = datetime.now()
+    results = {}
+    try:
+        for name, template in ENDPOINTS.items():
+            path = template.format(today=f"{today:%Y-%m-%d}", month=f"{today + timedelta(days=30):%Y-%m-%d}")
+            run_load(base_url, [path], args.concurrency, min(2, args.duration))
+            result = run_load(base_url, [path], args.concurrency, args.duration)
+            result["path"] = path
+            result["bytes"] = payload_sizes(base_url, path)
+            results[name] = result
+            print(f"{name:26} {result['throughput']:8.1f} req/s  p50 {result['p50_ms'] or 0:7.1f}  p95 {result['p95_ms'] or 0:7.1f}  "
+                  f"p99 {result['p99_ms'] or 0:7.1f} ms  {result['bytes']['identity']:>9} B  {result['bytes']['gzip']:>8} B gzip  {result['errors']} errors")
+    finally:
+        server.shutdown()
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "backend": backend,
+        "scale": args.scale,
+        "documents": {model.__name__: count for model, count in counts.items()},
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "cache": args.cache,
+        "endpoints": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Per-request CPU for serializing a list endpoint's documents, before and
+after the raw path:
+
+  hydrated   Document objects, then to_mongo() and json_util per document
+  to_json    QuerySet.to_json(): as_pymongo() rows through json_util
+  raw        as_pymongo() rows through serialization.dumps
+  endpoint   paginate() as the endpoints call it (adds the _id sort and cursor)
+
+It also checks that every path produces the same JSON.
+
+    python benchmarks/list_serialization.py [--documents 3000] [--runs 20] [--json]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from bson import json_util
+from bson.json_util import LEGACY_JSON_OPTIONS
+
+from seed import connect, seed, GENERATORS
+
+from pagination import PageRequest, paginate
+from serialization import dumps
+
+def cpu_ms(func, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.process_time()
+        func()
+        samples.append((time.process_time() - started) * 1000)
+    return statistics.median(samples)
+
+def paths(model):
+    return {
+        "hydrated": lambda: json_util.dumps([document.to_mongo() for document in model.objects()], json_options=LEGACY_JSON_OPTIONS),
+        "to_json": lambda: model.objects().to_json(),
+        "raw": lambda: dumps(list(model.objects().as_pymongo())),
+        "endpoint": lambda: paginate(model.objects(), PageRequest(model, {}))[0],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=3000)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--mongodb-url', help='benchmark against this server instead of mongomock')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    backend = connect(args.mongodb_url)
+    seed(args.documents)
+
+    results = {}
+    for model in GENERATORS:
+        candidates = paths(model)
+        outputs = {name: json.loads(path()) for name, path in candidates.items()}
+        if any(output != outputs["to_json"] for output in outputs.values()):
+            raise SystemExit(f"{model.__name__}: serialization paths disagree")
+        results[model.__name__] = {name: cpu_ms(path, args.runs) for name, path in candidates.items()}
+
+    if args.json:
+        print(json.dumps({"backend": backend, "documents": args.documents, "runs": args.runs, "cpu_ms": results}, indent=2))
+        return
+    print(f"{args.documents} documents per collection on {backend}, median CPU ms of {args.runs} runs")
+    print(f"{'':20}" + "".join(f"{name:>11}" for name in paths(None)))
+    for model, timings in results.items():
+        print(f"{model:20}" + "".join(f"{ms:11.1f}" for ms in timings.values()))
+
+if __name__ == '__main__':
+    main()
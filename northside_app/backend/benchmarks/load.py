@@ -0,0 +1,76 @@
+"""Closed-loop HTTP load generation and latency statistics shared by the benchmarks."""
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+def percentile(samples, fraction):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def summarize(latencies, errors, elapsed):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": max(latencies) if latencies else None,
+    }
+
+def run_load(base_url, paths, concurrency, duration, headers=None):
+    """
+    Runs `concurrency` clients for `duration` seconds, each sending the next
+    of `paths` as soon as its previous response has been read, over a
+    kept-alive connection. Returns summarize() of the successful requests.
+    """
+    target = urlsplit(base_url)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        connection = None
+        own = []
+        failed = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            try:
+                if connection is None:
+                    connection = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+                started = time.perf_counter()
+                connection.request('GET', path, headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status >= 400:
+                    failed += 1
+                else:
+                    own.append(elapsed)
+                if response.getheader('Connection', '').lower() == 'close':
+                    connection.close()
+                    connection = None
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                if connection is not None:
+                    connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
@@ -0,0 +1,95 @@
+"""
+Load test of the API under each gunicorn worker mode. For every mode it
+starts gunicorn against a local Mongo seeded with synthetic data, waits
+for /api/ready, then drives the list endpoints and /api/home with
+concurrent kept-alive clients and reports throughput and latency
+percentiles. The response cache is off unless --cache is given, so the
+numbers reflect Mongo and serialization.
+
+    python benchmarks/load_test.py --mongodb-url mongodb://localhost:27017/northside_bench \\
+        [--modes sync,gthread,gevent] [--concurrency 32] [--duration 15] [--json]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from seed import BACKEND_DIR, check_benchmark_database, connect, seed
+from load import run_load
+
+PATHS = ['/api/schedule/athletics', '/api/roster?sport=soccer', '/api/schedule/general', '/api/announcements', '/api/home']
+
+def wait_ready(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/ready", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("gunicorn didn't become ready")
+
+def start_gunicorn(mode, port, args):
+    env = dict(
+        os.environ,
+        MONGODB_URL=args.mongodb_url,
+        GUNICORN_WORKER_CLASS=mode,
+        PORT=str(port),
+        WEB_CONCURRENCY=str(args.workers),
+        API_CACHE='1' if args.cache else '0',
+    )
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mongodb-url', default=os.environ.get('BENCHMARK_MONGODB_URL'), required='BENCHMARK_MONGODB_URL' not in os.environ)
+    parser.add_argument('--modes', default='sync,gthread,gevent')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--documents', type=int, default=2000)
+    parser.add_argument('--port', type=int, default=18000)
+    parser.add_argument('--cache', action='store_true', help='leave the per-worker response cache on')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    check_benchmark_database(args.mongodb_url)
+    connect(args.mongodb_url)
+    seed(args.documents)
+
+    results = {}
+    for mode in args.modes.split(','):
+        if mode == 'gevent' and importlib.util.find_spec('gevent') is None:
+            print("Skipping gevent: not installed", file=sys.stderr)
+            continue
+        server = start_gunicorn(mode, args.port, args)
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            wait_ready(base_url)
+            # Warm up each worker's connections and imports before measuring
+            run_load(base_url, PATHS, args.concurrency, 2)
+            results[mode] = run_load(base_url, PATHS, args.concurrency, args.duration, headers={'Accept-Encoding': 'gzip'})
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    if args.json:
+        print(json.dumps({"documents": args.documents, "concurrency": args.concurrency, "duration": args.duration, "cache": args.cache, "results": results}, indent=2))
+        return
+    print(f"{args.documents} documents, {args.concurrency} clients for {args.duration:.0f}s, {args.workers} workers, cache {'on' if args.cache else 'off'}")
+    print(f"{'mode':10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode, result in results.items():
+        print(f"{mode:10}{result['throughput']:10.1f}{result['p50_ms'] or 0:10.1f}{result['p95_ms'] or 0:10.1f}{result['p99_ms'] or 0:10.1f}{result['errors']:8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Response size and time for each list endpoint in the json and compact
+formats, uncompressed, gzip and (when the brotli package is installed)
+br. Server time is the median wall time through the Flask test client
+with the response cache off; transfer time is estimated for the given
+link speeds, since on cellular networks that dominates.
+
+    python benchmarks/payload_size.py [--documents 2000] [--runs 10] [--mbps 1.5,10] [--json]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from seed import connect, seed
+
+ENDPOINTS = ['/api/roster', '/api/schedule/athletics', '/api/schedule/general', '/api/announcements']
+FORMATS = ['json', 'compact']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--mbps', default='1.5,10', help='link speeds to estimate transfer time for')
+    parser.add_argument('--mongodb-url', help='benchmark against this server instead of mongomock')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+    speeds = [float(speed) for speed in args.mbps.split(',')]
+
+    backend = connect(args.mongodb_url)
+    seed(args.documents)
+    import main as api
+    import compression
+    import response_cache
+    response_cache.CACHE_ENABLED = False
+    client = api.app.test_client()
+
+    encodings = ['identity', 'gzip'] + (['br'] if compression.brotli is not None else [])
+    results = []
+    for endpoint in ENDPOINTS:
+        for format in FORMATS:
+            for encoding in encodings:
+                timings = []
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    response = client.get(f"{endpoint}?format={format}", headers={'Accept-Encoding': encoding})
+                    timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise SystemExit(f"{endpoint} returned {response.status_code}")
+                size = len(response.get_data())
+                results.append({
+                    "endpoint": endpoint,
+                    "format": format,
+                    "encoding": encoding,
+                    "bytes": size,
+                    "server_ms": statistics.median(timings),
+                    "transfer_ms": {str(speed): size * 8 / (speed * 1000) for speed in speeds},
+                })
+
+    if args.json:
+        print(json.dumps({"backend": backend, "documents": args.documents, "results": results}, indent=2))
+        return
+    print(f"{args.documents} documents per collection on {backend}")
+    print(f"{'endpoint':26}{'format':>9}{'encoding':>10}{'bytes':>10}{'server ms':>11}" + "".join(f"{f'@{speed}Mbps ms':>14}" for speed in speeds))
+    for result in results:
+        transfer = "".join(f"{ms:14.0f}" for ms in result['transfer_ms'].values())
+        print(f"{result['endpoint']:26}{result['format']:>9}{result['encoding']:>10}{result['bytes']:>10}{result['server_ms']:11.1f}{transfer}")
+
+if __name__ == '__main__':
+    main()
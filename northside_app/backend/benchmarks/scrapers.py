@@ -0,0 +1,304 @@
+"""
+Offline harness for the scrapers. Pages come from synthetic generators
+(--events per page) or from a recorded fixtures directory (--fixtures,
+a manifest.json mapping each url to a saved file), never the live sites.
+
+  phases   times each scraper's parse, transform (ingest.prepare: model
+           validation, clean() and hashing) and write (ingest.write into
+           an empty collection, then again after 10% of records change)
+  replay   serves the pages from a local HTTP stand-in and runs the real
+           update_general_events and update_athletics_roster (with its
+           track and field step stubbed out, since it needs Chrome) against
+           it, twice each so the repeat shows the unchanged-page path
+  record   saves the live calendar and MaxPreps sports and roster pages to
+           a fixtures directory for later runs
+
+    python benchmarks/scrapers.py phases [--events 2000] [--fixtures DIR] [--json]
+    python benchmarks/scrapers.py replay [--events 200] [--fixtures DIR]
+    python benchmarks/scrapers.py record --out DIR
+
+The athletics schedule and athletic.net pages are rendered by JavaScript,
+so record skips them: save the page source from a browser after it has
+loaded and add it to manifest.json under its url.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(BENCHMARK_DIR)))
+
+SCHEDULE_URL = "https://www.northsideprepathletics.com/schedule?year=2025-2026"
+SPORTS_URL = "https://www.maxpreps.com/il/chicago/northside-mustangs/"
+ROSTER_URL = "https://www.maxpreps.com/il/chicago/northside-mustangs/soccer/girls/varsity/fall/roster/"
+TRACK_URL = "https://www.athletic.net/team/19718/track-and-field-outdoor/2026"
+
+SPORTS = ['Soccer', 'Basketball', 'Volleyball', 'Cross Country', 'Swimming', 'Tennis', 'Baseball', 'Softball']
+SCHOOLS = ['Lane Tech', 'Whitney Young', 'Payton', 'Jones', 'Lincoln Park', 'Taft', 'Von Steuben', 'Mather']
+
+# Synthetic pages, using the markup each parser looks for
+
+def schedule_page(count, rng):
+    cards = []
+    start = datetime(2025, 8, 15)
+    for i in range(count):
+        day = start + timedelta(days=i * 270 // max(count, 1))
+        cards.append(f"""
+<div class="flex flex-col gap-2" data-testid="event-card-{i}">
+  <h3 class="uppercase">{day:%b %d %Y}</h3>
+  <p class="text-base font-bold" data-testid="event-time-{i}">{rng.choice(['4:00 PM', '4:30 PM', '6:00 PM', '10:00 AM'])}</p>
+  <p class="text-base font-bold" data-testid="event-activity-name-{i}">{rng.choice(SPORTS)}</p>
+  <div class="text-sm font-medium text-core-contrast text-opacity-80 xl:text-base" data-testid="event-gender-level-{i}">{rng.choice(['Girls', 'Boys'])} {rng.choice(['Varsity', 'JV', 'Freshman'])}</div>
+  <h2 class="mb-1 font-heading text-xl">{rng.choice(['vs ', 'at '])}{rng.choice(SCHOOLS)}</h2>
+  <p class="text-sm font-medium" data-testid="event-venue-{i}">{rng.choice(['Northside Prep', 'Winnemac Stadium', 'Hanson Park'])}</p>
+  <div class="inline-flex items-center gap-2 last:mr-0">{rng.choice(['Home', 'Away'])}</div>
+</div>""")
+    return f"<html><body><main>{''.join(cards)}</main></body></html>"
+
+def roster_page(count, rng):
+    rows = []
+    for i in range(count):
+        rows.append(f"""
+<tr><td>{i + 1}</td><td class="primary"><a class="sc-51f90f89-0 hcqeYd name" href="#">Player {i}</a></td>
+<td>{rng.choice(['Fr.', 'So.', 'Jr.', 'Sr.'])}</td><td>{rng.choice(['F', 'MF', 'D', 'GK'])}</td></tr>""")
+    return f"<html><body><table><tbody>{''.join(rows)}</tbody></table></body></html>"
+
+def calendar_page(count, rng):
+    cells = []
+    for i in range(count):
+        weekend = ' weekend' if i % 7 in (5, 6) else ''
+        time_label = f'<span class="edEventDate">{rng.choice(["8:00 AM", "3:15 PM"])}</span>' if rng.random() < 0.6 else ''
+        cells.append(f"""
+<div class="day prev{weekend}"><span class="dayLabel">{i % 28 + 1}</span>
+<a class="eventInfoAnchor" href="#">School Event {i}</a>{time_label}</div>""")
+    return f"<html><body><div class='calendar'>{''.join(cells)}</div></body></html>"
+
+def meets_payload(count, rng):
+    return json.dumps({"meets": [{
+        "MeetID": i,
+        "MeetName": f"Invitational {i}",
+        "StartDate": (datetime(2026, 3, 1) + timedelta(days=i % 90)).strftime('%Y-%m-%dT00:00:00'),
+        "Location": {"Name": rng.choice(['Lane Stadium', 'Hanson Park', 'Northside Prep'])},
+    } for i in range(count)]})
+
+def synthetic_pages(events, seed=0):
+    rng = random.Random(seed)
+    from backend.scraping.general_events import calendar_months
+
+    pages = {
+        SCHEDULE_URL: schedule_page(events, rng),
+        SPORTS_URL: '<html><body><span class="sport-name">Soccer</span></body></html>',
+        ROSTER_URL: roster_page(events, rng),
+        TRACK_URL: meets_payload(events, rng),
+    }
+    for _, _, url in calendar_months():
+        pages[url] = calendar_page(max(1, events // 24), rng)
+    return pages
+
+def load_fixtures(directory):
+    with open(os.path.join(directory, 'manifest.json')) as file:
+        manifest = json.load(file)
+    pages = {}
+    for url, name in manifest.items():
+        with open(os.path.join(directory, name), encoding='utf-8') as file:
+            pages[url] = file.read()
+    return pages
+
+# Scrapers under test: which pages each parses and how
+
+def scrapers(pages):
+    from backend.models.Athlete import Athlete
+    from backend.models.AthleticsSchedule import AthleticsSchedule
+    from backend.models.GeneralEvent import GeneralEvent
+    from backend.scraping.athletics_roster import parse_roster
+    from backend.scraping.athletics_schedule import parse_athletics_schedule
+    from backend.scraping.general_events import calendar_months, parse_calendar_month
+    from backend.scraping.trackandfield import find_meets, meet_records
+    from backend.sportsandseasons import BASE_URL
+
+    def roster_team(url):
+        sport, gender, level, season = urlsplit(url).path.strip('/').split('/')[-5:-1]
+        return {"sport": sport, "gender": gender, "level": level, "season": season, "url": url}
+
+    def track_meets(url, payload):
+        meets = find_meets(json.loads(payload))
+        sport = urlsplit(url).path.split('/')[-2]
+        return meet_records(sport, url, [meet["name"] for meet in meets], [meet["date"] for meet in meets], [meet["location"] for meet in meets])
+
+    months = {url: (month_num, year_num) for month_num, year_num, url in calendar_months()}
+    return {
+        "athletics_schedule": (AthleticsSchedule, lambda: [
+            record for url, html in pages.items() if url.startswith(SCHEDULE_URL.split('?')[0])
+            for record in parse_athletics_schedule(html, url)
+        ]),
+        "athletics_roster": (Athlete, lambda: [
+            dict(record, sport=record['sport'].upper()) for url, html in pages.items() if url.startswith(BASE_URL) and url.endswith('/roster/')
+            for record in parse_roster(html, roster_team(url))
+        ]),
+        "general_events": (GeneralEvent, lambda: [
+            record for url, html in pages.items() if url in months
+            for record in parse_calendar_month(html, *months[url], url)
+        ]),
+        # The meet data the Selenium path reads from the page, without the browser
+        "track_meets": (AthleticsSchedule, lambda: [
+            record for url, payload in pages.items() if url.startswith('https://www.athletic.net/')
+            for record in track_meets(url, payload)
+        ]),
+    }
+
+# A field outside each model's dedup key, so editing it updates rather than inserts
+EDITED_FIELD = {"athletics_schedule": "location", "athletics_roster": "position", "general_events": "description", "track_meets": "location"}
+
+def timed(func, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(samples)
+
+def edit(record, field):
+    if isinstance(record, tuple):
+        return record._replace(**{field: 'Edited'})
+    return dict(record, **{field: 'Edited'})
+
+def run_phases(pages, runs):
+    from backend.ingest import dedup_key, prepare, write
+
+    results = {}
+    for name, (model, parse) in scrapers(pages).items():
+        records, parse_ms = timed(parse, runs)
+        result = {"records": len(records), "parse_ms": parse_ms}
+        if records:
+            key_fields = dedup_key(model)
+            documents, result["transform_ms"] = timed(lambda: prepare(model, records, key_fields), runs)
+            collection = model._get_collection()
+            collection.delete_many({})
+            _, result["write_insert_ms"] = timed(lambda: write(model, documents, key_fields), 1)
+            # A typical refresh: most records unchanged, some edited
+            edited = [edit(record, EDITED_FIELD[name]) if i % 10 == 0 else record for i, record in enumerate(records)]
+            changed = prepare(model, edited, key_fields)
+            _, result["write_update_ms"] = timed(lambda: write(model, changed, key_fields), 1)
+        results[name] = result
+    return results
+
+# Local stand-in for the live sites
+
+def serve(pages):
+    by_path = {}
+    for url, body in pages.items():
+        parts = urlsplit(url)
+        by_path[f"/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else '')] = body.encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = by_path.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', '"' + hashlib.sha1(body).hexdigest() + '"')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_replay(pages):
+    from backend.scraping import fetch
+
+    server = serve(pages)
+    # Point every fetch at the stand-in, without the HTTP cache or per-host spacing
+    fetch.REPLAY_URL = f"http://127.0.0.1:{server.server_port}"
+    fetch.cache = None
+    fetch.limiter.interval = 0
+
+    from backend.scraping import athletics_roster
+    from backend.scraping.general_events import update_general_events
+
+    # The track and field roster drives Chrome, so the crawl runs without it
+    athletics_roster.update_track_and_field_roster = lambda pages: iter(())
+
+    results = {}
+    try:
+        for attempt in ['first', 'repeat']:
+            _, results[f"general_events_{attempt}_ms"] = timed(update_general_events, 1)
+        for attempt in ['first', 'repeat']:
+            _, results[f"roster_{attempt}_ms"] = timed(athletics_roster.update_athletics_roster, 1)
+    finally:
+        server.shutdown()
+    return results
+
+def record(directory):
+    import requests
+    from backend.scraping.general_events import calendar_months
+    from backend.sportsandseasons import discover_sports, discover_teams
+
+    os.makedirs(directory, exist_ok=True)
+    urls = [url for _, _, url in calendar_months()] + [SPORTS_URL] + [team["url"] for team in discover_teams(discover_sports())]
+    manifest = {}
+    session = requests.Session()
+    for url in urls:
+        response = session.get(url, timeout=(5, 15))
+        if response.status_code != 200:
+            continue
+        name = hashlib.sha1(url.encode()).hexdigest()[:16] + '.html'
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as file:
+            file.write(response.text)
+        manifest[url] = name
+        time.sleep(0.2)
+    with open(os.path.join(directory, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    print(f"Recorded {len(manifest)} of {len(urls)} pages to {directory}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('mode', choices=['phases', 'replay', 'record'])
+    parser.add_argument('--events', type=int, default=2000, help='events per synthetic page')
+    parser.add_argument('--fixtures', help='recorded fixtures directory instead of synthetic pages')
+    parser.add_argument('--out', help='directory for record')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--mongodb-url', help='write to this server instead of mongomock')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    if args.mode == 'record':
+        if not args.out:
+            parser.error('record needs --out')
+        record(args.out)
+        return
+
+    sys.path.insert(0, BENCHMARK_DIR)
+    from seed import connect
+    backend = connect(args.mongodb_url)
+    pages = load_fixtures(args.fixtures) if args.fixtures else synthetic_pages(args.events)
+
+    results = run_phases(pages, args.runs) if args.mode == 'phases' else run_replay(pages)
+    if args.json:
+        print(json.dumps({"mode": args.mode, "backend": backend, "events": None if args.fixtures else args.events, "results": results}, indent=2))
+        return
+    print(f"{args.mode} on {backend}, {'fixtures from ' + args.fixtures if args.fixtures else f'{args.events} events per synthetic page'}")
+    for name, result in results.items():
+        if isinstance(result, dict):
+            print(f"{name:20} " + "  ".join(f"{key} {value:.1f}" if isinstance(value, float) else f"{key} {value}" for key, value in result.items()))
+        else:
+            print(f"{name:28} {result:.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Synthetic data for the benchmarks. connect() uses MONGODB_URL when it is
+set and otherwise an in-memory mongomock database (pip install mongomock),
+so nothing here touches a real collection unless asked to.
+"""
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import mongoengine
+from pymongo import uri_parser
+
+from models.Athlete import Athlete
+from models.AthleticsSchedule import AthleticsSchedule
+from models.GeneralEvent import GeneralEvent
+from models.Announcement import Announcement
+
+SPORTS = ['soccer', 'basketball', 'volleyball', 'cross-country', 'track-and-field', 'swimming', 'tennis', 'baseball']
+LEVELS = ['varsity', 'jv', 'freshman']
+GENDERS = ['girls', 'boys']
+SEASONS = ['fall', 'winter', 'spring']
+GRADES = ['Fr.', 'So.', 'Jr.', 'Sr.']
+
+def connect(url=None):
+    url = url or os.environ.get('BENCHMARK_MONGODB_URL')
+    if url:
+        check_benchmark_database(url)
+        mongoengine.connect(host=url)
+        return url
+    import mongomock
+    mongoengine.connect('benchmark', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    return 'mongomock'
+
+def check_benchmark_database(url):
+    # seed() wipes the API collections, so refuse anything that doesn't look like a scratch database
+    name = uri_parser.parse_uri(url).get('database') or ''
+    if 'bench' not in name and 'test' not in name:
+        raise SystemExit(f"Refusing to seed database {name!r}: use a database whose name contains 'bench' or 'test'")
+
+def day(offset):
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=offset)
+
+def athletes(count, rng):
+    for i in range(count):
+        yield Athlete(
+            name=f"Athlete {i}", number=i, sport=rng.choice(SPORTS), season=rng.choice(SEASONS),
+            level=rng.choice(LEVELS), gender=rng.choice(GENDERS), grade=rng.choice(GRADES),
+            position=rng.choice(['Forward', 'Guard', 'Setter', 'N/A']),
+        )
+
+def athletics_events(count, rng):
+    for i in range(count):
+        yield AthleticsSchedule(
+            name=f"Game {i}", date=day(rng.randint(-200, 200)).strftime('%b %d %Y'), time='4:30 PM',
+            gender=rng.choice(GENDERS), sport=rng.choice(SPORTS), level=rng.choice(LEVELS),
+            opponent=f"School {rng.randint(1, 60)}", location='Northside Prep', home=rng.random() < 0.5,
+        )
+
+def general_events(count, rng):
+    for i in range(count):
+        yield GeneralEvent(
+            date=day(rng.randint(-200, 200)).strftime('%B %d, %Y'), time='All Day', name=f"Event {i}",
+            description='Synthetic event ' * 5, location='Main Gym', createdBy='benchmark',
+        )
+
+def announcements(count, rng):
+    for i in range(count):
+        start = rng.randint(-60, 60)
+        yield Announcement(
+            start_date=day(start).strftime('%m/%d/%Y'), end_date=day(start + rng.randint(0, 14)).strftime('%m/%d/%Y'),
+            title=f"Announcement {i}", description='Synthetic announcement ' * 8, createdBy='benchmark',
+        )
+
+GENERATORS = {
+    Athlete: athletes,
+    AthleticsSchedule: athletics_events,
+    GeneralEvent: general_events,
+    Announcement: announcements,
+}
+
+# Roughly one school year at Northside: every team's roster and season, plus school events
+YEAR_VOLUMES = {
+    Athlete: 600,
+    AthleticsSchedule: 1200,
+    GeneralEvent: 250,
+    Announcement: 40,
+}
+
+def volumes(scale):
+    return {model: max(1, int(count * scale)) for model, count in YEAR_VOLUMES.items()}
+
+def seed(count, seed=0):
+    """
+    Replaces each API collection with generated documents: `count` of each,
+    or a {model: count} mapping such as volumes(scale).
+    """
+    rng = random.Random(seed)
+    counts = count if isinstance(count, dict) else dict.fromkeys(GENERATORS, count)
+    for model, generate in GENERATORS.items():
+        documents = []
+        for document in generate(counts[model], rng):
+            document.validate()
+            documents.append(document.to_mongo().to_dict())
+        collection = model._get_collection()
+        collection.delete_many({})
+        collection.insert_many(documents)
@@ -0,0 +1,90 @@
+"""
+Times cold imports of the app and scheduler modules, each in a fresh
+interpreter, and fails if one is over budget or pulls in a heavy
+dependency that should only load when a job runs.
+
+    python benchmarks/startup.py [--runs 5] [--budget 1.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'main',
+    'scheduler_imports',
+    'scraping.athletics_schedule',
+    'scraping.athletics_roster',
+    'scraping.general_events',
+    'gsheets.submissions',
+    'sportsandseasons',
+]
+# scheduler.py connects and starts its loop at import, so time what it imports instead
+SCHEDULER_IMPORTS = [
+    'scraping.athletics_schedule',
+    'scraping.athletics_roster',
+    'scraping.general_events',
+    'gsheets.submissions',
+    'carousel',
+    'maintenance',
+    'jobs',
+]
+HEAVY_MODULES = ['selenium', 'pandas', 'gspread', 'google.oauth2']
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def probe(module):
+    modules = SCHEDULER_IMPORTS if module == 'scheduler_imports' else [module]
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(modules=modules, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=float(os.environ.get('STARTUP_BUDGET', 1.0)), help='seconds per module')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    for module in MODULES:
+        runs = [probe(module) for _ in range(args.runs)]
+        seconds = [run['seconds'] for run in runs]
+        results[module] = {
+            "median": statistics.median(seconds),
+            "max": max(seconds),
+            "heavy": sorted(set(name for run in runs for name in run['heavy'])),
+        }
+
+    failures = [
+        module for module, result in results.items()
+        if result['median'] > args.budget or result['heavy']
+    ]
+
+    if args.json:
+        print(json.dumps({"budget": args.budget, "results": results, "failures": failures}, indent=2))
+    else:
+        for module, result in results.items():
+            heavy = f"  loads {', '.join(result['heavy'])}" if result['heavy'] else ""
+            print(f"{module:32} median {result['median']:.3f}s  max {result['max']:.3f}s{heavy}")
+        print(f"{len(failures)} over budget ({args.budget:.2f}s) or loading heavy modules" if failures else "All modules within budget")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
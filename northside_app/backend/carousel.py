@@ -1,38 +1,140 @@
-from datetime import datetime
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+import time
+
+from pymongo.errors import DuplicateKeyError
+
+from models.AthleticsSchedule import AthleticsSchedule
+from models.GeneralEvent import GeneralEvent
+from models.Announcement import Announcement
+from models.CarouselSnapshot import CarouselSnapshot
+from models.Lease import Lease
+from models.dates import parse_date
+from ingest import bump_version
+from serialization import public
+
+HOME_KEY = "home"
+REBUILD_LEASE_KEY = "carousel_rebuild"
+# How long a reader's claim on the daily rebuild lasts, so one killed mid-rebuild
+# (say by the gunicorn timeout) doesn't block it for the rest of the day
+REBUILD_LEASE = int(os.environ.get('CAROUSEL_REBUILD_LEASE', 60))
+# How long a first read waits for another reader's rebuild before building its own copy
+FIRST_BUILD_WAIT = float(os.environ.get('CAROUSEL_FIRST_BUILD_WAIT', 5))
+
+def item_date(item, parsed_field, raw_field):
+    # Documents written before the parsed fields existed fall back to parsing here
+    if item.get(parsed_field):
+        return item[parsed_field]
+    return parse_date(item.get(raw_field), item.get('createdAt'))
 
 def tenevents(announcements, events, athletics):
     now = datetime.now()
 
-    carousel = []
+    all_dates = [(item_date(announcement, 'parsed_end_date', 'end_date'), announcement) for announcement in announcements]
+    all_dates += [(item_date(event, 'parsed_date', 'date'), event) for event in events]
+    all_dates += [(item_date(schedule, 'parsed_date', 'date'), schedule) for schedule in athletics]
+    all_dates = [(date, item) for date, item in all_dates if date is not None]
+    all_dates.sort(key=lambda x: x[0])
+
+    start = bisect_left([date for date, _ in all_dates], now)
+    if start < len(all_dates):
+        all_dates = all_dates[start:start+10]
+
+    return [item for _, item in all_dates[-10:]]
+
+def build_carousel():
+    # Raw documents: tenevents only reads a few keys, so hydrating every document is wasted work
+    announcements = list(Announcement.objects().exclude('id').as_pymongo())
+    events = list(GeneralEvent.objects().exclude('id').as_pymongo())
+    athletics_schedule = list(AthleticsSchedule.objects().exclude('id').as_pymongo())
+    # The parsed dates only matter for picking the items
+    return [public(item) for item in tenevents(announcements, events, athletics_schedule)]
+
+def snapshot_version(day, items):
+    return hashlib.sha1(json.dumps([day, items], sort_keys=True, default=str).encode()).hexdigest()
 
-    announcement_dates = [{"date":announcement['end_date'], "index": index, "type": "Announcement"} for index, announcement in enumerate(announcements)]
-    event_dates = [{"date":event['date'], "index": index, "type": "Event"} for index, event in enumerate(events)]
-    athletics_dates = [{"date":schedule['date'], "index": index, "type": "Athletics"} for index, schedule in enumerate(athletics)]
+def refresh_carousel():
+    """
+    Recomputes the home carousel and stores it as a snapshot, so /api/home
+    only has to read a single document. Call this whenever the underlying
+    collections change.
+    """
+    items = build_carousel()
+    day = datetime.now().strftime('%Y-%m-%d')
+    version = snapshot_version(day, items)
 
-    # Athletics schedule in MMM DD YYYY, convert it to MM/DD/YYYY format
-    for date in athletics_dates:
+    CarouselSnapshot.objects(key=HOME_KEY).update_one(
+        upsert=True,
+        set__version=version,
+        set__day=day,
+        set__items=items,
+        set__createdAt=datetime.now()
+    )
+    bump_version(CarouselSnapshot)
+    print(f"Carousel snapshot refreshed: {len(items)} items, version {version[:12]}")
+    return CarouselSnapshot.objects(key=HOME_KEY).as_pymongo().first()
+
+def claim_rebuild():
+    """
+    Takes the rebuild lease unless another reader holds one that hasn't
+    expired: the upsert only matches an expired lease, and inserting a
+    second one fails on the unique key.
+    """
+    now = datetime.now()
+    try:
+        Lease._get_collection().update_one(
+            {'key': REBUILD_LEASE_KEY, 'expiresAt': {'$lte': now}},
+            {'$set': {'expiresAt': now + timedelta(seconds=REBUILD_LEASE)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+def release_rebuild():
+    Lease._get_collection().delete_one({'key': REBUILD_LEASE_KEY})
+
+def wait_for_snapshot():
+    deadline = time.monotonic() + FIRST_BUILD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        snapshot = CarouselSnapshot.objects(key=HOME_KEY).as_pymongo().first()
+        if snapshot is not None:
+            return snapshot
+    # Still not there: build this reader's own copy without storing it
+    items = build_carousel()
+    day = datetime.now().strftime('%Y-%m-%d')
+    return {'key': HOME_KEY, 'day': day, 'version': snapshot_version(day, items), 'items': items}
+
+def get_carousel():
+    """
+    Returns the current carousel snapshot as a raw document. The carousel
+    depends on today's date, so a missing snapshot or one from a previous
+    day is rebuilt on read, by whichever reader holds the rebuild lease.
+    Reads that arrive meanwhile get the previous day's snapshot, or on the
+    very first read wait for the new one.
+    """
+    snapshot = CarouselSnapshot.objects(key=HOME_KEY).as_pymongo().first()
+    if snapshot is not None and snapshot['day'] == datetime.now().strftime('%Y-%m-%d'):
+        return snapshot
+
+    if claim_rebuild():
+        # Another reader may have finished a rebuild since the read above
+        current = CarouselSnapshot.objects(key=HOME_KEY).as_pymongo().first()
+        if current is not None and current['day'] == datetime.now().strftime('%Y-%m-%d'):
+            return current
         try:
-            date['date'] = datetime.strptime(date['date'], '%b %d %Y').strftime('%m/%d/%Y')
-        except ValueError:
-            if '-' in date['date']:
-                date['date'] = date["date"].split('-')[0].strip()
-            date['date'] = datetime.strptime(date['date'], '%a, %b %d').replace(year=athletics[date['index']]["createdAt"].year).strftime('%m/%d/%Y')
-
-    all_dates = announcement_dates + event_dates + athletics_dates
-    all_dates.sort(key=lambda x: datetime.strptime(x['date'], '%m/%d/%Y'))
-    
-    for date in all_dates:
-        if datetime.strptime(date['date'], '%m/%d/%Y') >= now:
-            i = all_dates.index(date)
-            all_dates = all_dates[i:i+10]
-            break
-
-    for date in all_dates[-10:]:
-        if date["type"] == "Announcement":
-            carousel.append(announcements[date["index"]])
-        elif date["type"] == "Event":
-            carousel.append(events[date["index"]])
-        elif date["type"] == "Athletics":
-            carousel.append(athletics[date["index"]])
-
-    return carousel
+            return refresh_carousel()
+        except Exception as e:
+            # Hand the lease back so the next read tries again
+            release_rebuild()
+            if snapshot is None:
+                raise
+            print(f"Error refreshing the carousel snapshot: {e}")
+
+    if snapshot is None:
+        return wait_for_snapshot()
+    return snapshot
@@ -0,0 +1,47 @@
+import gzip
+import os
+
+# In requirements.txt; the fallback keeps a bare checkout serving gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_ENABLED = os.environ.get('API_COMPRESSION', '1') != '0'
+# Below this many bytes the headers cost more than compression saves
+MIN_SIZE = int(os.environ.get('API_COMPRESSION_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.environ.get('API_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('API_BROTLI_QUALITY', 5))
+
+def negotiate(accept_encodings):
+    """The encoding to use for a request's Accept-Encoding: br, then gzip, else None."""
+    if not COMPRESSION_ENABLED:
+        return None
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compress(response, encoding):
+    """
+    Compresses a 200 response body in place. The ETag gets the encoding as
+    a suffix, since the compressed bytes are a different representation,
+    and Vary tells caches the body depends on Accept-Encoding.
+    """
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if encoding is None or len(body) < MIN_SIZE or response.content_encoding:
+        return response
+
+    if encoding == 'br':
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    response.set_data(body)
+    response.content_encoding = encoding
+
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
@@ -2,13 +2,15 @@ from scraping.athletics_schedule import update_athletics_schedule
 from scraping.athletics_roster import update_athletics_roster
 from scraping.general_events import update_general_events
 from gsheets.submissions import update_submissions
+from carousel import refresh_carousel
 from datetime import datetime
 
 def update_data():
     while True:
         if datetime.now().weekday() == 0 and datetime.now().strftime("%H:%M") == "10:00":
             print("Updating general schedule...")
-            update_general_events()
+            if update_general_events():
+                refresh_carousel()
             print("General schedule update completed.")
         if datetime.now().day == 1 and datetime.now().strftime("%H:%M") == "11:00":
             print("Updating athletics schedule...")
@@ -16,8 +18,10 @@ def update_data():
             print("Athletics schedule update completed.")
         if datetime.now().strftime("%H:%M") == "12:00":
             print("Updating athletics schedule...")
-            update_athletics_schedule()
+            changed = update_athletics_schedule()
             print("Athletics schedule update completed.")
             print("Updating submissions...")
-            update_submissions()
-            print("Submissions update completed.")
\ No newline at end of file
+            changed = update_submissions() or changed
+            print("Submissions update completed.")
+            if changed:
+                refresh_carousel()
\ No newline at end of file
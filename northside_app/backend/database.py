@@ -0,0 +1,48 @@
+import os
+
+from dotenv import load_dotenv
+from mongoengine import connect, disconnect
+from mongoengine.connection import ConnectionFailure, get_connection
+from pymongo.errors import PyMongoError
+
+load_dotenv()
+
+MONGODB_URL = os.environ.get('MONGODB_URL')
+# Per process: each gunicorn worker and the scheduler get their own pool
+MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE', 10))
+MIN_POOL_SIZE = int(os.environ.get('MONGODB_MIN_POOL_SIZE', 0))
+# In milliseconds; a query fails after this long without a usable server instead of hanging for pymongo's 30s default
+SERVER_SELECTION_TIMEOUT = int(os.environ.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 5000))
+CONNECT_TIMEOUT = int(os.environ.get('MONGODB_CONNECT_TIMEOUT_MS', 5000))
+
+def connect_db():
+    """
+    Registers the default connection once per process. Later calls reuse it,
+    so scrapers can call this at the top of every run. pymongo opens sockets
+    lazily, so this doesn't wait on the server.
+    """
+    try:
+        return get_connection()
+    except ConnectionFailure:
+        connect(
+            host=MONGODB_URL,
+            maxPoolSize=MAX_POOL_SIZE,
+            minPoolSize=MIN_POOL_SIZE,
+            serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT,
+            connectTimeoutMS=CONNECT_TIMEOUT,
+        )
+        return get_connection()
+
+def reconnect():
+    # MongoClient isn't fork-safe, so a forked worker drops the parent's client and opens its own
+    disconnect()
+    return connect_db()
+
+def ping():
+    """Readiness check: True when the server answers within the selection timeout."""
+    try:
+        connect_db().admin.command('ping')
+        return True
+    except PyMongoError as e:
+        print(f"Database ping failed: {e}")
+        return False
@@ -1,5 +1,3 @@
-import gspread
-from google.oauth2.service_account import Credentials
 import os
 
 scopes = [
@@ -11,6 +9,10 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 credentials_path = os.path.join(script_dir, "credentials.json")
 
 def connect_to_gsheets():
+    # gspread and google-auth are slow to import and only the sheets sync needs them
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     try:
         cred = Credentials.from_service_account_file(credentials_path, scopes=scopes)
         client = gspread.authorize(cred)
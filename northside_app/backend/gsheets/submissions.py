@@ -1,13 +1,15 @@
 import sys
 import os
+import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from backend.gsheets.connection import connect_to_gsheets
 
 from backend.models.GeneralEvent import GeneralEvent
 from backend.models.Announcement import Announcement
-from mongoengine import connect
-from dotenv import load_dotenv
+from backend.ingest import bulk_upsert
+from backend.scraping.fingerprints import PageTracker
+from backend.database import connect_db
 
 def update_submissions():
     sheet = connect_to_gsheets()
@@ -17,8 +19,7 @@ def update_submissions():
     
     print("Updating submissions...")
     try:
-        load_dotenv()
-        connect(host=os.environ['MONGODB_URL'])
+        connect_db()
     except Exception as e:
         print(f"Error connecting to the database: {e}")
         return
@@ -27,11 +28,13 @@ def update_submissions():
     data = worksheet.get_all_values()
     columns = data[0]
 
-    existing_events = 0
-    added_events = 0
+    pages = PageTracker()
+    if not pages.changed(f"https://docs.google.com/spreadsheets/d/{sheet.id}", json.dumps(data)):
+        print("Submissions sheet unchanged since the last sync, skipping.")
+        return False
 
-    existing_announcements = 0
-    added_announcements = 0
+    events = []
+    announcements = []
 
     for row in data[1:]:
         if row[0] != '' and row[-1] == "TRUE":
@@ -40,55 +43,32 @@ def update_submissions():
                 if row[columns.index("Time")] == "":
                     row[columns.index("Time")] = "All Day"
 
-                existing_event = GeneralEvent.objects(
-                    date=row[columns.index("Date")],
-                    time=row[columns.index("Time")],
-                    name=row[columns.index("Event Title")],
-                    description=row[columns.index("Description")],
-                    location=row[columns.index("Location")],
-                    createdBy=row[columns.index("Hosted by?")]
-                ).first()
-
-                if not existing_event:
-                    event = GeneralEvent(
-                        date=row[columns.index("Date")],
-                        time=row[columns.index("Time")],
-                        name=row[columns.index("Event Title")],
-                        description=row[columns.index("Description")],
-                        location=row[columns.index("Location")],
-                        createdBy=row[columns.index("Hosted by?")]
-                    )
-                    event.save()
-                    added_events += 1
-
-                else:
-                    existing_events += 1
+                events.append({
+                    "date": row[columns.index("Date")],
+                    "time": row[columns.index("Time")],
+                    "name": row[columns.index("Event Title")],
+                    "description": row[columns.index("Description")],
+                    "location": row[columns.index("Location")],
+                    "createdBy": row[columns.index("Hosted by?")]
+                })
             
             elif row[3] == "Announcement":
 
-                existing_announcement = Announcement.objects(
-                    start_date=row[columns.index("Start day of appearance")],
-                    end_date=row[columns.index("End day of appearance")],
-                    title=row[columns.index("Announcement Title")],
-                    description=row[columns.index("Text")],
-                    createdBy=row[columns.index("Announcement by who?")]
-                ).first()
-
-                if not existing_announcement:
-                    announcement = Announcement(
-                        start_date=row[columns.index("Start day of appearance")],
-                        end_date=row[columns.index("End day of appearance")],
-                        title=row[columns.index("Announcement Title")],
-                        description=row[columns.index("Text")],
-                        createdBy=row[columns.index("Announcement by who?")]
-                    )
-                    announcement.save()
-                    added_announcements += 1
+                announcements.append({
+                    "start_date": row[columns.index("Start day of appearance")],
+                    "end_date": row[columns.index("End day of appearance")],
+                    "title": row[columns.index("Announcement Title")],
+                    "description": row[columns.index("Text")],
+                    "createdBy": row[columns.index("Announcement by who?")]
+                })
 
-                else:
-                    existing_announcements += 1
+    event_counts = bulk_upsert(GeneralEvent, events)
+    announcement_counts = bulk_upsert(Announcement, announcements)
+    pages.commit()
 
-    print(f"Submissions processed: {added_events} new events added, {existing_events} events already existed")
-    print(f"Submissions processed: {added_announcements} new announcements added, {existing_announcements} announcements already existed")
+    print(f"Submissions processed: {event_counts['inserted']} new events added, {event_counts['updated']} updated, {event_counts['unchanged']} events already existed")
+    print(f"Submissions processed: {announcement_counts['inserted']} new announcements added, {announcement_counts['updated']} updated, {announcement_counts['unchanged']} announcements already existed")
+    return event_counts['inserted'] + event_counts['updated'] + announcement_counts['inserted'] + announcement_counts['updated'] > 0
 
-update_submissions()
+if __name__ == '__main__':
+    update_submissions()
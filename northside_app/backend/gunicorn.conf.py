@@ -1,12 +1,44 @@
 import os
 
+# gthread (default): each worker serves `threads` requests at once, so a slow Mongo query
+# only holds its own thread. gevent: cooperative greenlets, up to worker_connections per
+# worker; needs `pip install gevent`. sync: one request per worker, as before.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "gevent":
+    # preload_app imports pymongo and threading in the master, so patch before anything else
+    from gevent import monkey
+    monkey.patch_all()
+
 port = os.environ.get("PORT", "10000")
 bind = f"0.0.0.0:{port}"
-workers = 2
-worker_class = "sync"
-worker_connections = 1000
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+# gunicorn quietly turns any worker with threads > 1 into gthread, so the other classes get one
+threads = int(os.environ.get("GUNICORN_THREADS", 8)) if worker_class == "gthread" else 1
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
 timeout = 30
 keepalive = 2
 max_requests = 1000
 max_requests_jitter = 100
-preload_app = True
\ No newline at end of file
+preload_app = True
+
+# Each worker has its own Mongo pool. Size it to the requests a worker can have in flight,
+# capped for gevent so a burst doesn't open hundreds of sockets per worker.
+if worker_class == "gthread":
+    concurrency = threads
+elif worker_class == "gevent":
+    concurrency = min(worker_connections, int(os.environ.get("GUNICORN_GEVENT_POOL_CAP", 50)))
+else:
+    concurrency = 1
+os.environ.setdefault("MONGODB_MAX_POOL_SIZE", str(concurrency))
+
+def on_starting(server):
+    # Build indexes once in the master, before any worker takes requests.
+    # preload_app has already imported main, which opens the connection.
+    from maintenance import ensure_indexes
+    ensure_indexes()
+
+def post_fork(server, worker):
+    # The master's client was used for the indexes above and can't be shared across a fork
+    from database import reconnect
+    reconnect()
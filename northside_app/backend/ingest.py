@@ -0,0 +1,125 @@
+import hashlib
+import json
+from datetime import datetime
+
+from mongoengine import ValidationError
+from pymongo import UpdateOne
+
+BATCH_SIZE = 500
+# models.DataVersion's collection; written directly since scrapers import this module under the backend package
+VERSIONS_COLLECTION = 'data_versions'
+
+def dedup_key(model):
+    # The first unique compound index declared on the model identifies a record
+    for spec in model._meta['index_specs']:
+        if spec.get('unique'):
+            return [field for field, _ in spec['fields']]
+    raise ValueError(f"{model.__name__} has no unique index to key records on")
+
+def bump_version(model, name=None):
+    """Tells API workers that the collection changed, so they drop their cached responses."""
+    name = name or model._get_collection_name()
+    model._get_db()[VERSIONS_COLLECTION].update_one(
+        {'key': name},
+        {'$inc': {'version': 1}, '$set': {'updatedAt': datetime.now()}},
+        upsert=True
+    )
+
+def changed(counts):
+    return counts.get("inserted", 0) + counts.get("updated", 0) + counts.get("deleted", 0) > 0
+
+def content_hash(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+def prepare(model, records, key_fields):
+    """
+    Builds each record through the model, so defaults and clean() (which
+    fills the parsed date fields) apply exactly as they would on save().
+    Records that share a dedup key collapse to the last one. Records may be
+    dicts or named tuples, and any iterable (a scraper's generator) works.
+    """
+    documents = {}
+    for record in records:
+        if isinstance(record, tuple):
+            record = record._asdict()
+        document = model(**record)
+        try:
+            document.validate()
+        except ValidationError as e:
+            print(f"Skipping invalid {model.__name__} record {record}: {e}")
+            continue
+        data = document.to_mongo().to_dict()
+        data.pop('_id', None)
+        data.pop('contentHash', None)
+        created_at = data.pop('createdAt', None)
+        data['contentHash'] = content_hash(data)
+        documents[tuple(data.get(field) for field in key_fields)] = (data, created_at)
+    return documents
+
+def bulk_upsert(model, records):
+    """
+    Writes records (dicts or named tuples of model fields) in a handful of round trips.
+    Records whose content hash is already stored are skipped, the rest are
+    upserted on the model's dedup key. Returns inserted, updated and
+    unchanged counts.
+    """
+    key_fields = dedup_key(model)
+    counts = write(model, prepare(model, records, key_fields), key_fields)
+    if changed(counts):
+        bump_version(model)
+    return counts
+
+def sync_collection(model, records, scope):
+    """
+    Applies a refresh as a diff: new and changed records are upserted as in
+    bulk_upsert, and documents matching `scope` (the filter for everything
+    this refresh is responsible for) whose content hash is no longer
+    produced are deleted. Unchanged documents are not touched.
+    """
+    key_fields = dedup_key(model)
+    documents = prepare(model, records, key_fields)
+    counts = write(model, documents, key_fields)
+
+    hashes = [data['contentHash'] for data, _ in documents.values()]
+    result = model._get_collection().delete_many(dict(scope, contentHash={'$nin': hashes}))
+    counts["deleted"] = result.deleted_count
+    if changed(counts):
+        bump_version(model)
+    return counts
+
+def write(model, documents, key_fields):
+    collection = model._get_collection()
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    if collection.estimated_document_count() == 0:
+        # Fresh (or just dropped) collection: build the indexes while it is empty, then plain inserts
+        model.ensure_indexes()
+        rows = [dict(data, createdAt=created_at or datetime.now()) for data, created_at in documents.values()]
+        for start in range(0, len(rows), BATCH_SIZE):
+            collection.insert_many(rows[start:start+BATCH_SIZE], ordered=False)
+        counts["inserted"] = len(rows)
+        return counts
+
+    hashes = [data['contentHash'] for data, _ in documents.values()]
+    stored = set()
+    for start in range(0, len(hashes), BATCH_SIZE):
+        batch = hashes[start:start+BATCH_SIZE]
+        stored.update(doc['contentHash'] for doc in collection.find({'contentHash': {'$in': batch}}, {'contentHash': 1, '_id': 0}))
+
+    operations = []
+    for key, (data, created_at) in documents.items():
+        if data['contentHash'] in stored:
+            counts["unchanged"] += 1
+            continue
+        operations.append(UpdateOne(
+            dict(zip(key_fields, key)),
+            {'$set': data, '$setOnInsert': {'createdAt': created_at or datetime.now()}},
+            upsert=True
+        ))
+
+    for start in range(0, len(operations), BATCH_SIZE):
+        result = collection.bulk_write(operations[start:start+BATCH_SIZE], ordered=False)
+        counts["inserted"] += result.upserted_count
+        counts["updated"] += result.modified_count
+
+    return counts
@@ -0,0 +1,139 @@
+import os
+import random
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from models.JobRun import JobRun
+
+MAX_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+# Defaults for jobs that don't set their own, in seconds
+JOB_TIMEOUT = float(os.environ.get('JOB_TIMEOUT', 45 * 60))
+JOB_JITTER = float(os.environ.get('JOB_JITTER', 60))
+JOB_RETRIES = int(os.environ.get('JOB_RETRIES', 2))
+RETRY_BACKOFF = float(os.environ.get('JOB_RETRY_BACKOFF', 30))
+TICK = 1.0
+HEARTBEAT_SECONDS = 300
+
+class Job:
+    def __init__(self, name, func, interval, timeout=JOB_TIMEOUT, retries=JOB_RETRIES, jitter=JOB_JITTER):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+        self.retries = retries
+        self.jitter = jitter
+        self.next_run = None
+        self.future = None
+        self.started = None
+        self.timed_out = False
+
+    def schedule_next(self, after):
+        self.next_run = after + self.interval + random.uniform(0, self.jitter)
+
+class JobRunner:
+    """
+    Runs jobs on a thread pool so a slow scraper doesn't hold up the others.
+
+    Each job runs at most once at a time: a job that is still running when it
+    comes due again is skipped until it finishes. A failing attempt is retried
+    with exponential backoff, and an exception never reaches the loop. Python
+    can't stop a thread, so a job past its timeout is recorded as timed out
+    and keeps its slot until it returns. Every run is recorded in JobRun, and
+    after a restart a job waits out the rest of its interval since its last
+    start instead of running straight away; a job with no recorded run
+    starts within its jitter window.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.jobs = []
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.stopping = threading.Event()
+
+    def add(self, name, func, interval, **options):
+        self.jobs.append(Job(name, func, interval, **options))
+
+    def record(self, job, **fields):
+        try:
+            JobRun.objects(name=job.name).update_one(upsert=True, **{f'set__{key}': value for key, value in fields.items()})
+        except Exception as e:
+            print(f"[jobs] {job.name}: could not record run: {e}")
+
+    def first_runs(self):
+        now = time.time()
+        last_starts = {run.name: run.startedAt for run in JobRun.objects(name__in=[job.name for job in self.jobs]).only('name', 'startedAt')}
+        for job in self.jobs:
+            started = last_starts.get(job.name)
+            if started is None:
+                # Never run (a fresh deploy): start within the jitter window instead of an interval from now
+                job.next_run = now + random.uniform(0, job.jitter)
+            else:
+                # Runs are recorded in local time, like the rest of the data
+                job.schedule_next(started.timestamp())
+            print(f"[jobs] {job.name}: next run at {datetime.fromtimestamp(job.next_run):%Y-%m-%d %H:%M:%S}")
+
+    def attempt(self, job):
+        deadline = job.started + job.timeout
+        for attempt in range(1, job.retries + 2):
+            self.record(job, attempts=attempt)
+            try:
+                job.func()
+                return None
+            except Exception:
+                error = traceback.format_exc()
+                print(f"[jobs] {job.name}: attempt {attempt} failed\n{error}")
+            backoff = RETRY_BACKOFF * 2 ** (attempt - 1)
+            if attempt > job.retries or time.time() + backoff >= deadline or self.stopping.wait(backoff):
+                return error
+        return error
+
+    def run(self, job):
+        error = self.attempt(job)
+        finished = time.time()
+        duration = finished - job.started
+        if job.timed_out:
+            status = 'timeout'
+        else:
+            status = 'failed' if error else 'ok'
+        print(f"[jobs] {job.name}: {status} in {duration:.1f}s")
+        self.record(job, status=status, finishedAt=datetime.fromtimestamp(finished), duration=duration, error=error)
+
+    def start(self, job):
+        job.started = time.time()
+        job.timed_out = False
+        job.schedule_next(job.started)
+        print(f"[jobs] {job.name}: starting")
+        self.record(job, status='running', startedAt=datetime.fromtimestamp(job.started), finishedAt=None, duration=None, error=None, attempts=0)
+        job.future = self.pool.submit(self.run, job)
+
+    def tick(self):
+        now = time.time()
+        for job in self.jobs:
+            running = job.future is not None and not job.future.done()
+            if running:
+                if not job.timed_out and now - job.started > job.timeout:
+                    job.timed_out = True
+                    print(f"[jobs] {job.name}: still running after {job.timeout:.0f}s, marking it timed out")
+                    self.record(job, status='timeout')
+                if now >= job.next_run:
+                    print(f"[jobs] {job.name}: previous run still going, skipping this one")
+                    job.schedule_next(now)
+            elif now >= job.next_run:
+                self.start(job)
+
+    def run_forever(self):
+        self.first_runs()
+        last_heartbeat = time.time()
+        try:
+            while not self.stopping.is_set():
+                self.tick()
+                if time.time() - last_heartbeat >= HEARTBEAT_SECONDS:
+                    running = [job.name for job in self.jobs if job.future is not None and not job.future.done()]
+                    print(f"Heartbeat: {time.strftime('%Y-%m-%d %H:%M:%S')} - running: {', '.join(running) or 'none'}")
+                    last_heartbeat = time.time()
+                self.stopping.wait(TICK)
+        finally:
+            self.stopping.set()
+            self.pool.shutdown(wait=False)
@@ -1,24 +1,54 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+import os
 # import threading
 # from dataUpdate import update_data
-from mongoengine import connect
-import os
-from dotenv import load_dotenv
 
 from models.Athlete import Athlete
 from models.AthleticsSchedule import AthleticsSchedule
 from models.GeneralEvent import GeneralEvent
 from models.Announcement import Announcement
-from carousel import tenevents
+from models.dates import parse_query_date, end_of_day
+from carousel import get_carousel
+from database import connect_db, ping
+from pagination import PageRequest, paginate
+from response_cache import cache, cached
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'ETag', 'Last-Modified'])
+
+connect_db()
+
+# Seconds clients and proxies may reuse a response before revalidating. Scrapers run hourly,
+# the sheets sync feeds events and announcements, and rosters rarely change mid-season.
+MAX_AGE = {
+    'roster': int(os.environ.get('API_MAX_AGE_ROSTER', 3600)),
+    'schedule': int(os.environ.get('API_MAX_AGE_SCHEDULE', 300)),
+    'announcements': int(os.environ.get('API_MAX_AGE_ANNOUNCEMENTS', 300)),
+    'home': int(os.environ.get('API_MAX_AGE_HOME', 60)),
+}
+
+def date_range(start_field='parsed_date', end_field='parsed_date'):
+    # from/to are inclusive YYYY-MM-DD bounds on the parsed date fields
+    query = {}
+    start = request.args.get('from')
+    end = request.args.get('to')
+    if start:
+        query[f'{end_field}__gte'] = parse_query_date(start)
+    if end:
+        query[f'{start_field}__lt'] = end_of_day(parse_query_date(end))
+    return query
 
-load_dotenv()
-connect(host=os.environ.get('MONGODB_URL'))
+def list_response(model, query):
+    # The body stays a plain array; the cursor for the next page, if any, goes in a header
+    body, next_cursor = paginate(model.objects(**query), PageRequest(model, request.args))
+    response = app.response_class(body, mimetype='application/json')
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 @app.route('/api/roster', methods=['GET'])
+@cached('athletes', MAX_AGE['roster'])
 def roster():
     try:
         sport = request.args.get('sport')
@@ -33,12 +63,14 @@ def roster():
         if level:
             query['level'] = level
         
-        athletes = Athlete.objects(**query).to_json()
-        return athletes
+        return list_response(Athlete, query)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/schedule/athletics', methods=['GET'])
+@cached('athletics_schedule', MAX_AGE['schedule'])
 def schedule():
     try:
         sport = request.args.get('sport')
@@ -50,7 +82,7 @@ def schedule():
         home = request.args.get('home')
         name = request.args.get('name')
 
-        query = {}
+        query = date_range()
         if sport:
             query['sport'] = sport
         if season:
@@ -68,19 +100,21 @@ def schedule():
         if name:
             query['name'] = name
         
-        events = AthleticsSchedule.objects(**query).to_json()
-        return events
+        return list_response(AthleticsSchedule, query)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 @app.route('/api/schedule/general', methods=['GET'])
+@cached('general_events', MAX_AGE['schedule'])
 def general_schedule():
     try:
         date = request.args.get('date')
         time = request.args.get('time')
         name = request.args.get('name')
 
-        query = {}
+        query = date_range()
         if date:
             query['date'] = date
         if time:
@@ -88,36 +122,52 @@ def general_schedule():
         if name:
             query['name'] = name
         
-        events = GeneralEvent.objects(**query).to_json()
-        return events
+        return list_response(GeneralEvent, query)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 @app.route('/api/announcements', methods=['GET'])
+@cached('announcements', MAX_AGE['announcements'])
 def announcements():
     try:
         date = request.args.get('date')
 
-        query = {}
+        # An announcement matches if it is showing at any point in the range
+        query = date_range(start_field='parsed_start_date', end_field='parsed_end_date')
         if date:
             query['start_date'] = date
         
-        announcements = Announcement.objects(**query).to_json()
-        return announcements
+        return list_response(Announcement, query)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 @app.route('/api/home', methods=['GET'])
+@cached('carousel_snapshots', MAX_AGE['home'])
 def home():
     try:
-        announcements = [announcement.to_mongo().to_dict() for announcement in Announcement.objects().exclude('id')]
-        events = [event.to_mongo().to_dict() for event in GeneralEvent.objects().exclude('id')]
-        athletics_schedule = [schedule.to_mongo().to_dict() for schedule in AthleticsSchedule.objects().exclude('id')]
-        carousel = tenevents(announcements, events, athletics_schedule)
-        return jsonify(carousel)
+        snapshot = get_carousel()
+        response = jsonify(snapshot['items'])
+        response.set_etag(snapshot['version'])
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    # For load balancer and deploy health checks: 503 until the database answers
+    if ping():
+        return jsonify({"status": "ok"})
+    return jsonify({"status": "unavailable"}), 503
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    # Per worker: each gunicorn process has its own cache
+    return jsonify({"cache": cache.stats()})
+
 if __name__ == '__main__':
     # tdataupdate = threading.Thread(target=update_data)
     # tdataupdate.start()
@@ -0,0 +1,105 @@
+import sys
+from pymongo.errors import OperationFailure, PyMongoError
+
+from database import connect_db
+
+from models.AthleticsSchedule import AthleticsSchedule
+from models.GeneralEvent import GeneralEvent
+from models.Announcement import Announcement
+from models.Athlete import Athlete
+from models.CarouselSnapshot import CarouselSnapshot
+from models.SourcePage import SourcePage
+from models.CrawlTarget import CrawlTarget
+from models.JobRun import JobRun
+from models.DataVersion import DataVersion
+from models.Lease import Lease
+
+MODELS = [Athlete, AthleticsSchedule, GeneralEvent, Announcement, CarouselSnapshot, SourcePage, CrawlTarget, JobRun, DataVersion, Lease]
+
+DUPLICATE_KEY = 11000
+
+def remove_duplicates(model):
+    """
+    Deletes all but the newest document (by _id) for every key of the
+    model's unique indexes that more than one document shares, so the
+    index can be built. Returns how many were removed.
+    """
+    collection = model._get_collection()
+    removed = 0
+    for spec in model._meta['index_specs']:
+        if not spec.get('unique'):
+            continue
+        fields = [field for field, _ in spec['fields']]
+        duplicates = collection.aggregate([
+            {'$sort': {'_id': -1}},
+            {'$group': {'_id': {field.replace('.', '_'): f"${field}" for field in fields}, 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+            {'$match': {'count': {'$gt': 1}}}
+        ], allowDiskUse=True)
+        for duplicate in duplicates:
+            print(f"{model.__name__}: {duplicate['count']} documents share {duplicate['_id']}, keeping the newest")
+            removed += collection.delete_many({'_id': {'$in': duplicate['ids'][1:]}}).deleted_count
+    return removed
+
+def ensure_indexes():
+    """
+    Creates the indexes declared on each model and drops ones that are no
+    longer declared. A unique index that fails over existing duplicates is
+    retried after remove_duplicates(). Models set auto_create_index to
+    False, so this runs once at startup instead of lazily on a worker's
+    first query.
+    """
+    try:
+        for model in MODELS:
+            try:
+                model.ensure_indexes()
+            except OperationFailure as e:
+                if e.code != DUPLICATE_KEY:
+                    print(f"{model.__name__}: could not create indexes: {e}")
+                else:
+                    # A unique index over documents written before its key was narrowed
+                    print(f"{model.__name__}: removed {remove_duplicates(model)} duplicate documents")
+                    try:
+                        model.ensure_indexes()
+                    except OperationFailure as e:
+                        print(f"{model.__name__}: could not create unique indexes even without duplicates, upserts on its key are unprotected: {e}")
+            collection = model._get_collection()
+            for index in model.compare_indexes()['extra']:
+                try:
+                    collection.drop_index(index)
+                    print(f"{model.__name__}: dropped stale index {index}")
+                except OperationFailure as e:
+                    print(f"{model.__name__}: could not drop index {index}: {e}")
+    except PyMongoError as e:
+        # Mongo is unreachable; the app still starts (/api/ready reports it)
+        # and the next deploy or scheduler start tries again
+        print(f"Could not update indexes: {e}")
+        return
+    print("Indexes are up to date")
+
+def backfill_parsed_dates():
+    """
+    Fills in the parsed date fields on documents written before they existed.
+    Validating a document runs its clean(), which computes the fields.
+    """
+    for model, missing in [
+        (AthleticsSchedule, {'parsed_date__exists': False}),
+        (GeneralEvent, {'parsed_date__exists': False}),
+        (Announcement, {'parsed_end_date__exists': False}),
+    ]:
+        updated = 0
+        for document in model.objects(**missing):
+            document.save()
+            updated += 1
+        print(f"{model.__name__}: backfilled parsed dates on {updated} documents")
+
+if __name__ == '__main__':
+    connect_db()
+
+    commands = {
+        'ensure-indexes': ensure_indexes,
+        'backfill-dates': backfill_parsed_dates,
+    }
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        print(f"Usage: python maintenance.py [{'|'.join(commands)}]")
+        sys.exit(1)
+    commands[sys.argv[1]]()
@@ -1,5 +1,6 @@
 from mongoengine import Document, StringField, DateTimeField, BooleanField
 from datetime import datetime
+from .dates import parse_date
 
 class Announcement(Document):
     start_date = StringField(required=True)
@@ -7,11 +8,23 @@ class Announcement(Document):
     title = StringField(required=True)
     description = StringField(required=False)
     createdBy = StringField(required=True)
-    createdAt = DateTimeField(required=True, default=datetime.now)    
+    createdAt = DateTimeField(required=True, default=datetime.now)
+    contentHash = StringField(required=False)
+    parsed_start_date = DateTimeField(required=False)
+    parsed_end_date = DateTimeField(required=False)
 
     meta = {
         'collection': 'announcements',
+        'auto_create_index': False,
         'indexes': [
-            {'fields': ['start_date', 'end_date', 'title', 'description', 'createdBy', 'createdAt'], 'unique': True}
+            # /api/announcements filters on start_date, or on the parsed date range
+            'parsed_start_date',
+            'parsed_end_date',
+            {'fields': ['start_date', 'end_date', 'title', 'createdBy'], 'unique': True},
+            'contentHash'
         ]
-    }
\ No newline at end of file
+    }
+
+    def clean(self):
+        self.parsed_start_date = parse_date(self.start_date, self.createdAt)
+        self.parsed_end_date = parse_date(self.end_date, self.createdAt)
@@ -11,10 +11,15 @@ class Athlete(Document):
     grade = StringField(required=True, enum=["Fr.", "So.", "Jr.", "Sr."])
     position = StringField(required=True)
     createdAt = DateTimeField(required=True, default=datetime.now)
+    contentHash = StringField(required=False)
+    source = StringField(required=False)
 
     meta = {
         'collection': 'athletes',
+        'auto_create_index': False,
         'indexes': [
-            {'fields': ['name', 'number', 'sport', 'level', 'gender', 'grade', 'position'], 'unique': True}
+            # /api/roster filters on sport, gender and level; the same prefix doubles as the dedup key
+            {'fields': ['sport', 'gender', 'level', 'season', 'name', 'number'], 'unique': True},
+            'contentHash'
         ]
-    }
\ No newline at end of file
+    }
@@ -1,5 +1,6 @@
 from mongoengine import Document, StringField, DateTimeField, BooleanField
 from datetime import datetime
+from .dates import parse_date
 
 class AthleticsSchedule(Document):
     name = StringField(required=False)
@@ -11,11 +12,22 @@ class AthleticsSchedule(Document):
     opponent = StringField(required=True)
     location = StringField(required=True)
     home = BooleanField(required=True)
-    createdAt = DateTimeField(required=True, default=datetime.now)    
+    createdAt = DateTimeField(required=True, default=datetime.now)
+    contentHash = StringField(required=False)
+    source = StringField(required=False)
+    parsed_date = DateTimeField(required=False)
 
     meta = {
         'collection': 'athletics_schedule',
+        'auto_create_index': False,
         'indexes': [
-            {'fields': ['date', 'time', 'gender', 'sport', 'level', 'opponent', 'location', 'home', 'createdAt'], 'unique': True}
+            # /api/schedule/athletics filters on sport, gender and level, then a date range
+            ['sport', 'gender', 'level', 'parsed_date'],
+            'parsed_date',
+            {'fields': ['date', 'time', 'sport', 'gender', 'level', 'opponent', 'name'], 'unique': True},
+            'contentHash'
         ]
-    }
\ No newline at end of file
+    }
+
+    def clean(self):
+        self.parsed_date = parse_date(self.date, self.createdAt)
@@ -0,0 +1,14 @@
+from mongoengine import Document, StringField, DateTimeField, ListField, DictField
+from datetime import datetime
+
+class CarouselSnapshot(Document):
+    key = StringField(required=True, unique=True)
+    version = StringField(required=True)
+    day = StringField(required=True)
+    items = ListField(DictField())
+    createdAt = DateTimeField(required=True, default=datetime.now)
+
+    meta = {
+        'collection': 'carousel_snapshots',
+        'auto_create_index': False
+    }
@@ -0,0 +1,14 @@
+from mongoengine import Document, StringField, DateTimeField, BooleanField, IntField
+from datetime import datetime
+
+class CrawlTarget(Document):
+    url = StringField(required=True, unique=True)
+    found = BooleanField(required=True)
+    checkedAt = DateTimeField(required=True, default=datetime.now)
+    foundAt = DateTimeField(required=False)
+    emptyParses = IntField(required=False, default=0)
+
+    meta = {
+        'collection': 'crawl_targets',
+        'auto_create_index': False
+    }
@@ -0,0 +1,12 @@
+from mongoengine import Document, StringField, DateTimeField, IntField
+
+class DataVersion(Document):
+    # One per collection; ingest.bump_version increments it whenever a write changes the collection
+    key = StringField(required=True, unique=True)
+    version = IntField(required=True, default=0)
+    updatedAt = DateTimeField(required=False)
+
+    meta = {
+        'collection': 'data_versions',
+        'auto_create_index': False
+    }
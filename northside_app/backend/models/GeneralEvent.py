@@ -1,5 +1,6 @@
 from mongoengine import Document, StringField, DateTimeField, BooleanField
 from datetime import datetime
+from .dates import parse_date
 
 class GeneralEvent(Document):
     date = StringField(required=True)
@@ -8,11 +9,21 @@ class GeneralEvent(Document):
     description = StringField(required=False)
     location = StringField(required=False)
     createdBy = StringField(required=True)
-    createdAt = DateTimeField(required=True, default=datetime.now)    
+    createdAt = DateTimeField(required=True, default=datetime.now)
+    contentHash = StringField(required=False)
+    source = StringField(required=False)
+    parsed_date = DateTimeField(required=False)
 
     meta = {
         'collection': 'general_events',
+        'auto_create_index': False,
         'indexes': [
-            {'fields': ['date', 'time', 'name', 'description', 'location', 'createdBy', 'createdAt'], 'unique': True}
+            # /api/schedule/general filters on date, time and name, or a date range
+            'parsed_date',
+            {'fields': ['date', 'time', 'name', 'createdBy'], 'unique': True},
+            'contentHash'
         ]
-    }
\ No newline at end of file
+    }
+
+    def clean(self):
+        self.parsed_date = parse_date(self.date, self.createdAt)
@@ -0,0 +1,15 @@
+from mongoengine import Document, StringField, DateTimeField, FloatField, IntField
+
+class JobRun(Document):
+    name = StringField(required=True, unique=True)
+    status = StringField(required=True, choices=['running', 'ok', 'failed', 'timeout'])
+    startedAt = DateTimeField(required=True)
+    finishedAt = DateTimeField(required=False)
+    duration = FloatField(required=False)
+    attempts = IntField(required=True, default=0)
+    error = StringField(required=False)
+
+    meta = {
+        'collection': 'job_runs',
+        'auto_create_index': False
+    }
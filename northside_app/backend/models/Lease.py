@@ -0,0 +1,12 @@
+from mongoengine import Document, StringField, DateTimeField
+
+class Lease(Document):
+    # A short-lived claim on a job only one process should run at a time; the unique key
+    # makes a second claim fail while the first is unexpired
+    key = StringField(required=True, unique=True)
+    expiresAt = DateTimeField(required=True)
+
+    meta = {
+        'collection': 'leases',
+        'auto_create_index': False
+    }
@@ -0,0 +1,12 @@
+from mongoengine import Document, StringField, DateTimeField
+from datetime import datetime
+
+class SourcePage(Document):
+    url = StringField(required=True, unique=True)
+    fingerprint = StringField(required=True)
+    checkedAt = DateTimeField(required=True, default=datetime.now)
+
+    meta = {
+        'collection': 'source_pages',
+        'auto_create_index': False
+    }
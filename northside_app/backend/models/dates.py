@@ -0,0 +1,74 @@
+import time
+from datetime import datetime, timedelta
+
+# Formats the scrapers and the submissions sheet produce, most common first
+DATE_FORMATS = ['%b %d %Y', '%m/%d/%Y', '%b %d, %Y', '%B %d, %Y', '%Y-%m-%d']
+# Formats without a year, e.g. "Fri, Sep 5" from the athletics site
+YEARLESS_FORMATS = ['%a, %b %d', '%b %d', '%a, %B %d', '%B %d']
+
+def parse_date(value, reference=None):
+    """
+    Parses the free-form date strings stored on the models into a datetime.
+    Ranges such as "Fri, Sep 5 - Sat, Sep 6" resolve to their first day.
+    Dates without a year take the year whose weekday matches when one is
+    given ("Fri, Jun 5"), else the year that puts them in the school year
+    (August to July) of `reference`, usually the document's createdAt.
+    Returns None if nothing matches.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if ' - ' in value:
+        value = value.split(' - ')[0].strip()
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+
+    reference = reference or datetime.now()
+    for date_format in YEARLESS_FORMATS:
+        try:
+            # Parse with a leap year so "Feb 29" is accepted
+            parsed = datetime.strptime(f"2000 {value}", f"%Y {date_format}")
+        except ValueError:
+            continue
+        candidates = []
+        for year in (reference.year - 1, reference.year, reference.year + 1):
+            try:
+                candidates.append(parsed.replace(year=year))
+            except ValueError:
+                continue
+        if date_format.startswith('%a'):
+            weekday = time.strptime(value.split(',')[0].strip(), '%a').tm_wday
+            matching = [candidate for candidate in candidates if candidate.weekday() == weekday]
+            if len(matching) == 1:
+                return matching[0]
+        school_year = school_year_start(reference)
+        for candidate in candidates:
+            if school_year_start(candidate) == school_year:
+                return candidate
+        if candidates:
+            # Feb 29 outside a leap school year
+            return min(candidates, key=lambda candidate: abs(candidate - reference))
+
+    return None
+
+def school_year_start(value):
+    # The school year runs from August to July
+    return value.year if value.month >= 8 else value.year - 1
+
+def parse_query_date(value):
+    """
+    Parses a YYYY-MM-DD query parameter, raising ValueError with a readable
+    message if it is malformed.
+    """
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+def end_of_day(value):
+    return value + timedelta(days=1)
@@ -0,0 +1,122 @@
+import base64
+import binascii
+import os
+
+from bson import json_util
+
+from serialization import INTERNAL_FIELDS, compact, dumps, public
+
+# The app fetches whole collections without a limit, so the default has to cover a full roster
+FORMATS = ('json', 'compact')
+DEFAULT_LIMIT = int(os.environ.get('API_DEFAULT_LIMIT', 5000))
+MAX_LIMIT = int(os.environ.get('API_MAX_LIMIT', 10000))
+
+class PageRequest:
+    """limit, cursor, fields, sort and format from the query string, checked against the model."""
+
+    def __init__(self, model, args, default_sort=()):
+        fields = model._fields
+
+        self.limit = DEFAULT_LIMIT
+        if args.get('limit'):
+            try:
+                self.limit = int(args['limit'])
+            except ValueError:
+                raise ValueError(f"limit must be a number, not {args['limit']!r}")
+            if not 1 <= self.limit <= MAX_LIMIT:
+                raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+        # sort=-parsed_date,name; _id always breaks ties so the cursor has a unique position
+        self.sort = []
+        for name in (args['sort'].split(',') if args.get('sort') else default_sort):
+            direction = -1 if name.startswith('-') else 1
+            name = name.lstrip('-+')
+            if name not in fields or name == 'id':
+                raise ValueError(f"Cannot sort by {name!r}")
+            self.sort.append((name, direction))
+        self.sort.append(('_id', 1))
+
+        self.fields = None
+        if args.get('fields'):
+            self.fields = [name for name in args['fields'].split(',') if name]
+            unknown = [name for name in self.fields if name not in fields]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        self.format = args.get('format') or 'json'
+        if self.format not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+
+        self.after = decode_cursor(args['cursor'], len(self.sort)) if args.get('cursor') else None
+
+    def projection(self):
+        if self.fields is None:
+            return None
+        # Sort keys are fetched for the next cursor and dropped before responding
+        return set(self.fields) | {name for name, _ in self.sort if name != '_id'}
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, length):
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Cursor doesn't match the sort order")
+    return values
+
+def after_filter(sort, values):
+    """
+    Keyset condition for rows that come after `values` in `sort` order:
+    equal on every earlier key and past the current one. Mongo sorts null
+    before every other value, so a null can't be compared with $gt/$lt.
+    """
+    branches = []
+    for i, ((name, direction), value) in enumerate(zip(sort, values)):
+        earlier = {prior: prior_value for (prior, _), prior_value in zip(sort[:i], values[:i])}
+        if value is None:
+            if direction < 0:
+                continue
+            past = {name: {'$ne': None}}
+        elif direction > 0:
+            past = {name: {'$gt': value}}
+        else:
+            past = {'$or': [{name: {'$lt': value}}, {name: None}]}
+        branches.append({'$and': [earlier, past]} if earlier else past)
+    return {'$or': branches} if branches else {'_id': {'$exists': False}}
+
+def paginate(queryset, page):
+    """
+    Returns (body, next_cursor) for one page of `queryset`. The body is the
+    same extended JSON array QuerySet.to_json() produces, or the compact
+    table for format=compact; next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by(*[('-' if direction < 0 else '') + ('id' if name == '_id' else name) for name, direction in page.sort])
+    if page.after is not None:
+        queryset = queryset.filter(__raw__=after_filter(page.sort, page.after))
+    projection = page.projection()
+    if projection is not None:
+        queryset = queryset.only(*projection)
+    else:
+        # Internal fields stay out of responses unless asked for; sort keys are still needed for the cursor
+        sort_keys = {name for name, _ in page.sort}
+        hidden = [name for name in INTERNAL_FIELDS if name in queryset._document._fields and name not in sort_keys]
+        if hidden:
+            queryset = queryset.exclude(*hidden)
+
+    rows = list(queryset.limit(page.limit + 1).as_pymongo())
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor([rows[-1].get(name) for name, _ in page.sort])
+
+    if page.fields is not None:
+        keep = set(page.fields) | {'_id'}
+        rows = [{key: value for key, value in row.items() if key in keep} for row in rows]
+    else:
+        rows = [public(row) for row in rows]
+    if page.format == 'compact':
+        return dumps(compact(rows)), next_cursor
+    return dumps(rows), next_cursor
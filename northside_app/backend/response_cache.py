@@ -0,0 +1,151 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import timezone
+from functools import wraps
+
+from cachetools import TTLCache
+from flask import current_app, request
+
+from models.DataVersion import DataVersion
+from compression import compress, negotiate
+
+# Per worker process. Size is counted in response bytes.
+CACHE_ENABLED = os.environ.get('API_CACHE', '1') != '0'
+CACHE_MAX_BYTES = int(float(os.environ.get('API_CACHE_MAX_MB', 64)) * 1024 * 1024)
+CACHE_TTL = float(os.environ.get('API_CACHE_TTL', 300))
+# How often a worker reads data_versions to notice a refresh, in seconds
+VERSION_CHECK_INTERVAL = float(os.environ.get('API_CACHE_VERSION_CHECK', 5))
+
+class ResponseStore(TTLCache):
+    # Counts entries pushed out for space, as opposed to expired or invalidated
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def clear(self):
+        # MutableMapping.clear() empties the cache through popitem()
+        evictions = self.evictions
+        super().clear()
+        self.evictions = evictions
+
+class ResponseCache:
+    """
+    Caches successful GET responses keyed on path and query string. Data only
+    changes when a scraper or the sheets sync writes, and those writes bump
+    a DataVersion document; when any version moves the whole cache is
+    dropped. Entries also expire after CACHE_TTL as a backstop, and the
+    least recently used go first when the cache is full.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL, check_interval=VERSION_CHECK_INTERVAL):
+        self.entries = ResponseStore(maxsize=max_bytes, ttl=ttl, getsizeof=lambda entry: len(entry[0]) or 1)
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.versions = None
+        self.updated = {}
+        self.checked_at = 0.0
+        self.metrics = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "version_errors": 0}
+
+    def check_versions(self):
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return
+        self.checked_at = now
+        try:
+            rows = list(DataVersion.objects().only('key', 'version', 'updatedAt').as_pymongo())
+        except Exception as e:
+            # Serving from cache is safe for a while; the TTL still bounds staleness
+            self.metrics["version_errors"] += 1
+            print(f"Could not read data versions: {e}")
+            return
+        versions = {row['key']: row['version'] for row in rows}
+        with self.lock:
+            self.updated = {row['key']: row.get('updatedAt') for row in rows}
+            if self.versions is not None and versions != self.versions:
+                self.entries.clear()
+                self.metrics["invalidations"] += 1
+            self.versions = versions
+
+    def last_modified(self, collection):
+        self.check_versions()
+        updated = self.updated.get(collection)
+        # Stored as naive local time, like the rest of the data
+        return updated.astimezone(timezone.utc) if updated else None
+
+    def get(self, key):
+        self.check_versions()
+        with self.lock:
+            entry = self.entries.get(key)
+            self.metrics["hits" if entry is not None else "misses"] += 1
+            return entry
+
+    def set(self, key, response):
+        body = response.get_data()
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            self.entries[key] = (body, response.status_code, dict(response.headers))
+            self.metrics["stores"] += 1
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                self.metrics,
+                evictions=self.entries.evictions,
+                entries=len(self.entries),
+                bytes=self.entries.currsize,
+                max_bytes=self.max_bytes,
+                ttl=self.entries.ttl,
+                pid=os.getpid(),
+            )
+
+cache = ResponseCache()
+
+def request_key(encoding):
+    # Same arguments in any order share an entry; each content encoding is stored separately
+    return (request.path, tuple(sorted(request.args.items(multi=True))), encoding)
+
+def cached(collection, max_age):
+    """
+    Serves a GET view from the response cache and makes it conditional:
+    200s carry an ETag (the view's own, or a hash of the body), a
+    Last-Modified from the collection's data version, and a public
+    Cache-Control of max_age seconds; a matching If-None-Match or
+    If-Modified-Since gets a bodiless 304. Bodies are compressed for
+    clients that accept it before they are cached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            encoding = negotiate(request.accept_encodings)
+            key = request_key(encoding)
+            entry = cache.get(key) if CACHE_ENABLED else None
+            if entry is not None:
+                body, status, headers = entry
+                response = current_app.response_class(body, status=status, headers=headers)
+            else:
+                response = view(*args, **kwargs)
+                if isinstance(response, tuple) or response.status_code != 200:
+                    return response
+                # Tagged before it is stored, so hits don't hash the body again
+                if not response.get_etag()[0]:
+                    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+                last_modified = cache.last_modified(collection)
+                if last_modified:
+                    response.last_modified = last_modified
+                response.cache_control.public = True
+                response.cache_control.max_age = max_age
+                compress(response, encoding)
+                if CACHE_ENABLED:
+                    cache.set(key, response)
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
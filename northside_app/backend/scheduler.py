@@ -1,35 +1,36 @@
-import schedule
-import time
-import os
-from dotenv import load_dotenv
-from mongoengine import connect
-
 print("=== SCHEDULER STARTING ===")
 
 from scraping.athletics_schedule import update_athletics_schedule
 from scraping.athletics_roster import update_athletics_roster
 from scraping.general_events import update_general_events
 from gsheets.submissions import update_submissions
+from carousel import refresh_carousel
+from maintenance import ensure_indexes
+from jobs import JobRunner
+from database import connect_db, ping
 print("Imports successful")
 
-load_dotenv()
-connect(host=os.environ.get('MONGODB_URL'))
-print("Database connected")
+connect_db()
+if ping():
+    print("Database connected")
+
+ensure_indexes()
+
+def refreshes_carousel(job):
+    # Jobs return True when they changed the data the home carousel is built from
+    def run():
+        if job():
+            refresh_carousel()
+    return run
 
-schedule.every().hour.do(update_athletics_schedule)
-schedule.every().hour.do(update_athletics_roster)
-schedule.every().hour.do(update_general_events)
-schedule.every().hour.do(update_submissions)
+HOUR = 60 * 60
 
-counter = 0
+runner = JobRunner()
+runner.add('athletics_schedule', refreshes_carousel(update_athletics_schedule), HOUR)
+runner.add('athletics_roster', update_athletics_roster, HOUR)
+runner.add('general_events', refreshes_carousel(update_general_events), HOUR)
+# The sheets sync is cheap, so it shouldn't sit behind the browser scrapers or hang for long
+runner.add('submissions', refreshes_carousel(update_submissions), HOUR, timeout=10 * 60)
 
 print("=== SCHEDULER CONFIGURED ===")
-while True:
-    # print(f"{counter}")
-    schedule.run_pending()
-    counter += 1
-    if counter % 300 == 0:
-        current_time = time.strftime("%Y-%m-%d %H:%M:%S")
-        print(f"Heartbeat: {current_time} - Scheduler running for approximately {counter} seconds")
-        counter = 0
-    time.sleep(1)
+runner.run_forever()
@@ -2,155 +2,124 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from bs4 import BeautifulSoup
 import requests
 
 from backend.models.Athlete import Athlete
-from mongoengine import connect
-from dotenv import load_dotenv
+from backend.ingest import sync_collection
+from backend.database import connect_db
 from backend.scraping.trackandfield import update_track_and_field_roster
+from backend.scraping.browser import browsers
+from backend.scraping.fingerprints import PageTracker
+from backend.scraping.fetch import fetch_all, log_cache_stats
+from backend.scraping.parsing import parse_html
+from backend.scraping.frontier import CrawlFrontier
+from backend.sportsandseasons import discover_sports, discover_teams
+
+def parse_roster(html_content, team):
+    """Returns an athlete record for each player on a MaxPreps roster page."""
+    soup = parse_html(html_content)
+
+    players = soup.find_all('a', class_="sc-51f90f89-0 hcqeYd name")
+    players = [player.get_text(strip=True) for player in players]
+    if not players:
+        return []
+
+    primary_tds = soup.find_all("td", class_="primary")
+    grades = []
+    positions = []
+    numbers = []
+    for td in primary_tds:
+        grade_td = td.find_next_sibling("td")
+        if grade_td:
+            grades.append(grade_td.get_text(strip=True))
+            position_td = grade_td.find_next_sibling("td")
+            if position_td:
+                positions.append(position_td.get_text(strip=True))
+            else:
+                positions.append("N/A")
+            number_td = td.find_previous_sibling("td")
+            if number_td:
+                number = number_td.get_text(strip=True)
+                numbers.append(int(number) if number.isdigit() else 0)
+            else:
+                numbers.append(0)
+
+    return [{
+        "name": player,
+        "number": numbers[players.index(player)],
+        "sport": team["sport"],
+        "season": team["season"],
+        "level": team["level"],
+        "gender": team["gender"],
+        "grade": grades[players.index(player)],
+        "position": positions[players.index(player)],
+        "source": team["url"]
+    } for player in players]
 
 def update_athletics_roster():
 
     print("===Updating athletics roster===")
     try:
-        load_dotenv()
-        connect(host=os.environ['MONGODB_URL'])
+        connect_db()
     except Exception as e:
         print(f"Error connecting to the database: {e}")
         return
     
-    url = "https://www.maxpreps.com/il/chicago/northside-mustangs/"
-    
-    try:
-        response = requests.get(url)
-        html_content = response.text
-        soup = BeautifulSoup(html_content, 'html.parser')
-    except Exception as e:
-        print(f"Error parsing HTML content: {e}")
+    sports = discover_sports()
+    if not sports:
         return
-    
-    sports = soup.find_all('span', class_="sport-name")
-    sports = [sport.get_text(strip=True).replace("& ", "").replace(" ", "-").lower() for sport in sports]
-    sports = list(set(sports))
-
-    genders = ["girls", "boys"]
-    seasons = ["fall", "winter", "spring"]
-    levels = ["varsity", "jv", "freshman"]
 
     roster = []
+    pages = PageTracker()
+    frontier = CrawlFrontier()
 
-    for sport in sports:
-        for gender in genders:
-            for season in seasons:
-                for level in levels:
-                    url = f"https://www.maxpreps.com/il/chicago/northside-mustangs/{sport}/{gender}/{level}/{season}/roster/"
-                    # url = f"https://www.maxpreps.com/il/chicago/northside-mustangs/{sport}/{gender}/{level}/{season}/24-25/roster/"
-                    try:
-                        response = requests.get(url, timeout=(10, 30))
-                        response.raise_for_status()
-                    except requests.RequestException as e:
-                        print(f"Error fetching {url}: {e}")
-                        continue
-
-                    html_content = response.text
-                    soup = BeautifulSoup(html_content, 'html.parser')
-
-                    players = soup.find_all('a', class_="sc-51f90f89-0 hcqeYd name")
-                    players = [player.get_text(strip=True) for player in players]
-                    if players:
-                        # print(players)
-
-                        primary_tds = soup.find_all("td", class_="primary")
-                        grades = []
-                        positions = []
-                        numbers = []
-                        for td in primary_tds:
-                            grade_td = td.find_next_sibling("td")
-                            if grade_td:
-                                grades.append(grade_td.get_text(strip=True))
-                                position_td = grade_td.find_next_sibling("td")
-                                if position_td:
-                                    positions.append(position_td.get_text(strip=True))
-                                else:
-                                    positions.append("N/A")
-                                number_td = td.find_previous_sibling("td")
-                                if number_td:
-                                    number = number_td.get_text(strip=True)
-                                    numbers.append(int(number) if number.isdigit() else 0)
-                                else:
-                                    numbers.append(0)
-
-                        # print(grades)
-                        # print(positions)
-                        for player in players:
-                            athlete = {
-                                "name": player,
-                                "number": numbers[players.index(player)],
-                                "sport": sport,
-                                "season": season,
-                                "level": level,
-                                "gender": gender,
-                                "grade": grades[players.index(player)],
-                                "position": positions[players.index(player)]
-                            }
-                            roster.append(athlete)
-    track_and_field_df = update_track_and_field_roster()
-
-    if Athlete.objects.count() == (len(roster)+len(track_and_field_df["name"])) or (len(roster)+len(track_and_field_df["name"])) == 0:
-        print("Athletes already exist in the database, skipping addition.")
-        return
-    else:
-        Athlete.drop_collection()
-        for athlete_data in roster:
-            exists = Athlete.objects(
-                name=athlete_data['name'],
-                number=athlete_data['number'],
-                sport=athlete_data['sport'].upper(),
-                season=athlete_data['season'],
-                level=athlete_data['level'],
-                gender=athlete_data['gender'],
-                grade=athlete_data['grade'],
-                position=athlete_data['position']
-            ).first()
-            if exists:
-                continue
-            athlete = Athlete(
-                name=athlete_data['name'],
-                number=athlete_data['number'],
-                sport=athlete_data['sport'].upper(),
-                season=athlete_data['season'],
-                level=athlete_data['level'],
-                gender=athlete_data['gender'],
-                grade=athlete_data['grade'],
-                position=athlete_data['position']
-            )
-            athlete.save()
-        for index, row in track_and_field_df.iterrows():
-            exists = Athlete.objects(
-                name=row['name'],
-                number=row['number'],
-                sport=row['sport'],
-                season=row['season'],
-                level=row['level'],
-                gender=row['gender'],
-                grade=row['grade'],
-                position=row['position']
-            ).first()
-            if exists:
-                continue
-            athlete = Athlete(
-                name=row['name'],
-                number=row['number'],
-                sport=row['sport'],
-                season=row['season'],
-                level=row['level'],
-                gender=row['gender'],
-                grade=row['grade'],
-                position=row['position']
-            )
-            athlete.save()
-
-        print(f"Added {len(roster)+len(track_and_field_df['name'])} athletes.")
-
-update_athletics_roster()
\ No newline at end of file
+    candidates = discover_teams(sports)
+    due_urls = set(frontier.due(team["url"] for team in candidates))
+    teams = [team for team in candidates if team["url"] in due_urls]
+    print(f"Crawling {len(teams)} roster pages, skipping {len(candidates) - len(teams)} known misses")
+    responses = fetch_all(team["url"] for team in teams)
+    log_cache_stats()
+
+    for team in teams:
+        url = team["url"]
+        response = responses[url]
+        if isinstance(response, requests.RequestException):
+            # A 404 means the team is gone; anything else may be transient, so keep its athletes
+            if getattr(response.response, 'status_code', None) == 404:
+                frontier.record(url, False)
+            else:
+                print(f"Error fetching {url}: {response}")
+                pages.fail(url)
+            continue
+
+        if not pages.changed(url, response.content):
+            frontier.record(url)
+            continue
+
+        players = parse_roster(response.text, team)
+        if players:
+            roster += players
+            frontier.record(url, True)
+        elif not frontier.record_empty(url):
+            # Probably a markup change or a challenge page rather than an empty team
+            print(f"No players parsed from {url}, keeping its athletes for now")
+            pages.fail(url)
+    for athlete_data in roster:
+        athlete_data['sport'] = athlete_data['sport'].upper()
+    records = roster + list(update_track_and_field_roster(pages))
+    browsers.release_idle()
+    frontier.commit()
+
+    if not records and not pages.unchanged:
+        print("No athletes found, skipping update.")
+        return False
+
+    # Athletes from pages that were unchanged or failed to load are left alone
+    counts = sync_collection(Athlete, records, {'source': {'$nin': pages.keep()}})
+    pages.commit()
+
+    print(f"Athletes updated: {counts['inserted']} inserted, {counts['updated']} updated, {counts['deleted']} deleted, {counts['unchanged']} unchanged")
+    return counts['inserted'] + counts['updated'] + counts['deleted'] > 0
+
+if __name__ == '__main__':
+    update_athletics_roster()
@@ -2,21 +2,30 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from bs4 import BeautifulSoup
-
 from backend.models.AthleticsSchedule import AthleticsSchedule
-from mongoengine import connect
-from dotenv import load_dotenv
-
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import time
+from backend.ingest import sync_collection
+from backend.database import connect_db
 
 from backend.scraping.trackandfield import update_track_and_field_schedule
-import pandas as pd
-
-chrome_options = Options()
-chrome_options.add_argument("--headless")
+from backend.scraping.fingerprints import PageTracker
+from backend.scraping.browser import browsers, count_elements, wait_until, wait_for_count_above, wait_for_network_idle
+from backend.scraping.parsing import parse_html
+from backend.scraping.timing import phase
+
+EVENT_SELECTOR = "h2.mb-1.font-heading.text-xl"
+# Fields read from inside each event card, as (tag, classes, data-testid fragment). These
+# mirror the card's CSS selectors but are checked directly, which is far cheaper per tag
+CARD_FIELDS = {
+    'time': ('p', {'text-base', 'font-bold'}, 'time'),
+    'sport': ('p', {'text-base', 'font-bold'}, 'activity-name'),
+    'location': ('p', {'text-sm', 'font-medium'}, 'venue'),
+    'team': ('div', {'text-sm', 'font-medium', 'text-core-contrast', 'text-opacity-80', 'xl:text-base'}, 'gender-level'),
+    'home': ('div', {'inline-flex', 'items-center', 'gap-2', 'last:mr-0'}, None),
+}
+MAX_SCROLL_ATTEMPTS = int(os.environ.get('SCHEDULE_MAX_SCROLLS', 20))
+# Longest to wait for a scroll to load more events, and how many empty scrolls end the page
+SCROLL_WAIT = float(os.environ.get('SCHEDULE_SCROLL_WAIT', 5))
+IDLE_SCROLLS = int(os.environ.get('SCHEDULE_IDLE_SCROLLS', 2))
 
 def update_athletics_schedule():
     """
@@ -26,138 +35,156 @@ def update_athletics_schedule():
 
     print("===Updating athletics schedule===")
     try:
-        load_dotenv()
-        connect(host=os.environ['MONGODB_URL'])
+        connect_db()
     except Exception as e:
         print(f"Error connecting to the database: {e}")
         return
     
     url = "https://www.northsideprepathletics.com/schedule?year=2025-2026"
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.get(url)
-    
-    time.sleep(5)
-    
-    print("Page loaded, starting to scroll...")
-    
-    previous_event_count = 0
-    no_new_content_count = 0
-    max_scroll_attempts = 20
-    scroll_attempt = 0
-    
-    while scroll_attempt < max_scroll_attempts:
-        current_events = driver.find_elements("css selector", "h2.mb-1.font-heading.text-xl")
-        current_event_count = len(current_events)
-        
-        print(f"Scroll attempt {scroll_attempt + 1}: Found {current_event_count} events")
-        
-        driver.execute_script("window.scrollBy(0, 1000);")
-        time.sleep(2)
-        
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(5)
-        
-        new_events = driver.find_elements("css selector", "h2.mb-1.font-heading.text-xl")
-        new_event_count = len(new_events)
-        
-        if new_event_count == current_event_count:
-            no_new_content_count += 1
-            print(f"No new content loaded (attempt {no_new_content_count})")
-            
-            if no_new_content_count >= 3:
-                print("No new content for 3 attempts, assuming all content loaded")
-                break
-        else:
-            no_new_content_count = 0
-            print(f"New content loaded: {new_event_count - current_event_count} new events")
-        
-        previous_event_count = new_event_count
-        scroll_attempt += 1
-    
-    print(f"Finished scrolling after {scroll_attempt} attempts. Final event count: {len(driver.find_elements('css selector', 'h2.mb-1.font-heading.text-xl'))}")
-    
-    time.sleep(5)
-    html_content = driver.page_source
-    driver.quit()
-
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    repeated_dates = soup.find_all('h3', class_='uppercase')
-    exact_dates = [h3 for h3 in repeated_dates if h3.get('class') == ['uppercase']]
-    dates = [h3.get_text(strip=True) for h3 in exact_dates]
-    print(f"Found {len(dates)} dates")
+    with browsers.driver() as driver:
+        with phase("athletics schedule page load"):
+            driver.get(url)
+            wait_until(lambda: count_elements(driver, EVENT_SELECTOR))
 
-    times = soup.select('p.text-base.font-bold[data-testid*="time"]')
-    times = [p.get_text(strip=True) for p in times]
-    print(f"Found {len(times)} times")
+        print("Page loaded, starting to scroll...")
 
-    sports = soup.select("p.text-base.font-bold[data-testid*='activity-name']")
-    sports = [p.get_text(strip=True) for p in sports]
-    print(f"Found {len(sports)} sports")
-
-    locations = soup.select("p.text-sm.font-medium[data-testid*='venue']")
-    locations = [p.get_text(strip=True) for p in locations]
-    print(f"Found {len(locations)} locations")
-
-    levels = soup.select("div.text-sm.font-medium.text-core-contrast.text-opacity-80.xl\\:text-base[data-testid*='gender-level']")
-    levels = [p.get_text(strip=True).split()[1].lower() if len(p.get_text(strip=True).split()) > 1 else p.get_text(strip=True).split()[0].lower() for p in levels]
-    print(f"Found {len(levels)} teams")
-
-    genders = soup.select("div.text-sm.font-medium.text-core-contrast.text-opacity-80.xl\\:text-base[data-testid*='gender-level']")
-    genders = [p.get_text(strip=True).split()[0].lower() for p in genders] 
+        with phase("athletics schedule scrolling"):
+            no_new_content_count = 0
+            scroll_attempt = 0
+            event_count = count_elements(driver, EVENT_SELECTOR)
+
+            while scroll_attempt < MAX_SCROLL_ATTEMPTS:
+                print(f"Scroll attempt {scroll_attempt + 1}: Found {event_count} events")
+
+                driver.execute_script("window.scrollBy(0, 1000);")
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                # Returns as soon as the next batch renders, or gives up after the cap
+                new_event_count = wait_for_count_above(driver, EVENT_SELECTOR, event_count, timeout=SCROLL_WAIT)
+
+                if new_event_count == event_count:
+                    no_new_content_count += 1
+                    print(f"No new content loaded (attempt {no_new_content_count})")
+
+                    if no_new_content_count >= IDLE_SCROLLS:
+                        print(f"No new content for {IDLE_SCROLLS} attempts, assuming all content loaded")
+                        break
+                else:
+                    no_new_content_count = 0
+                    print(f"New content loaded: {new_event_count - event_count} new events")
+
+                event_count = new_event_count
+                scroll_attempt += 1
+
+            print(f"Finished scrolling after {scroll_attempt} attempts. Final event count: {event_count}")
+
+        with phase("athletics schedule settle"):
+            wait_for_network_idle(driver)
+        html_content = driver.page_source
+
+    pages = PageTracker()
+    records = []
+    if pages.changed(url, html_content):
+        with phase("athletics schedule parse"):
+            records = parse_athletics_schedule(html_content, url)
+        if not records:
+            # An empty infinite-scroll page means it failed to load, not that the season was cancelled
+            pages.fail(url)
+    else:
+        print("Athletics schedule page unchanged since the last refresh, skipping parsing")
+
+    # Drained here rather than handed to sync_collection, since the delete scope depends on which meet pages it skipped
+    records += update_track_and_field_schedule(pages)
+    browsers.release_idle()
+
+    if not records and not pages.unchanged:
+        print("No athletics events found, skipping update.")
+        return False
+
+    # Events from pages that were unchanged or failed to load are left alone
+    with phase("athletics schedule write"):
+        counts = sync_collection(AthleticsSchedule, records, {'source': {'$nin': pages.keep()}})
+    pages.commit()
+
+    print(f"Athletics schedule updated: {counts['inserted']} inserted, {counts['updated']} updated, {counts['deleted']} deleted, {counts['unchanged']} unchanged (including track and field)")
+    return counts['inserted'] + counts['updated'] + counts['deleted'] > 0
+
+def is_event_date(tag):
+    # Date headings carry exactly the "uppercase" class; other h3s only include it
+    return tag.name == 'h3' and tag.get('class') == ['uppercase']
+
+def matches(tag, field):
+    name, classes, testid = field
+    return (tag.name == name and classes.issubset(tag.get('class', ()))
+            and (testid is None or testid in tag.get('data-testid', '')))
+
+def event_card(heading, neighbours):
+    """The outermost element around an event heading that holds neither neighbouring event."""
+    shared = {id(parent) for neighbour in neighbours for parent in neighbour.parents}
+    card = heading
+    for parent in heading.parents:
+        if id(parent) in shared or parent.name == '[document]':
+            break
+        card = parent
+    return card
+
+def card_fields(card):
+    """Reads every field in one walk over the card."""
+    found = {}
+    for tag in card.find_all(True):
+        if 'date' not in found and is_event_date(tag):
+            found['date'] = tag.get_text(strip=True)
+            continue
+        for name, field in CARD_FIELDS.items():
+            if name not in found and matches(tag, field):
+                found[name] = tag.get_text(strip=True)
+                break
+    return found
+
+def parse_event_card(heading, neighbours, url):
+    card = event_card(heading, neighbours)
+    fields = card_fields(card)
+    if 'date' not in fields:
+        # Days that group several events put the date above the cards instead of inside them
+        date = heading.find_previous(is_event_date)
+        if date:
+            fields['date'] = date.get_text(strip=True)
+    if len(fields) < len(CARD_FIELDS) + 1:
+        return None
+
+    words = fields['team'].split()
+    return {
+        "date": fields['date'],
+        "time": fields['time'],
+        "gender": words[0].lower(),
+        "sport": fields['sport'],
+        "level": words[1].lower() if len(words) > 1 else words[0].lower(),
+        "opponent": heading.get_text(strip=True).replace("vs ", "").replace("at ", ""),
+        "location": fields['location'],
+        "home": fields['home'].lower() == "home",
+        "source": url
+    }
+
+def parse_athletics_schedule(html_content, url):
+    """
+    Walks each event card once, so every record is built from its own card;
+    a card missing a field is dropped instead of shifting the rest.
+    """
+    soup = parse_html(html_content)
 
-    opponents = soup.select('h2.mb-1.font-heading.text-xl')
-    opponents = [h2.get_text(strip=True).replace("vs ", "").replace("at ", "") for h2 in opponents]
-    print(f"Found {len(opponents)} opponents")
+    headings = soup.select(EVENT_SELECTOR)
+    print(f"Found {len(headings)} events")
 
-    homes = soup.select("div.inline-flex.items-center.gap-2.last\\:mr-0")
-    homes = [div.get_text(strip=True) for div in homes]
-    homes = [item.lower() == "home" for item in homes]
-    print(f"Found {len(homes)} home/away indicators")
-    
-    length = len(dates)
-    print(f"Processing {length} events")
-    added_count = 0
+    records = []
+    for i, heading in enumerate(headings):
+        neighbours = headings[max(i - 1, 0):i] + headings[i + 1:i + 2]
+        record = parse_event_card(heading, neighbours, url)
+        if record:
+            records.append(record)
 
-    track_and_field_df = update_track_and_field_schedule()
-    total_track_elements = len(track_and_field_df['name'])
+    if len(records) < len(headings):
+        print(f"Skipped {len(headings) - len(records)} events with missing fields")
+    print(f"Processing {len(records)} events")
+    return records
 
-    if AthleticsSchedule.objects.count() == (length + total_track_elements) or (length + total_track_elements) == 0:
-        print("Athletics schedule already exists in the database, skipping addition.")
-        return
-    else:
-        AthleticsSchedule.drop_collection()
-
-    for i in range(length):
-        event = AthleticsSchedule(
-            date=dates[i],
-            time=times[i],
-            gender=genders[i],
-            sport=sports[i],
-            level=levels[i],
-            opponent=opponents[i],
-            location=locations[i],
-            home=homes[i]
-        )
-        event.save()
-        added_count += 1
-    
-    for index, row in track_and_field_df.iterrows():
-        track_event = AthleticsSchedule(
-            name=row['name'],
-            date=row['date'],
-            time=row['time'],
-            gender=row['gender'],
-            sport=row['sport'],
-            level=row['level'],
-            opponent=row['opponent'],
-            location=row['location'],
-            home=row['home']
-        )
-        track_event.save()
-        added_count += 1
-
-    print(f"Athletics schedule updated: {added_count} new events added (including track and field)")
-    # print(schedule)
-
-update_athletics_schedule()
\ No newline at end of file
+if __name__ == '__main__':
+    update_athletics_schedule()
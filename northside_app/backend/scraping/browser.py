@@ -0,0 +1,182 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+POOL_SIZE = int(os.environ.get('BROWSER_POOL_SIZE', 2))
+# Chrome's memory grows with every page, so a browser is replaced after this many checkouts
+MAX_USES = int(os.environ.get('BROWSER_MAX_USES', 25))
+
+# Caps for the condition-based waits below, in seconds
+WAIT_TIMEOUT = float(os.environ.get('BROWSER_WAIT_TIMEOUT', 20))
+SETTLE_SECONDS = float(os.environ.get('BROWSER_SETTLE_SECONDS', 1.0))
+POLL_INTERVAL = 0.2
+
+def chrome_options():
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    return options
+
+class BrowserPool:
+    """
+    A small pool of headless Chrome drivers shared by the Selenium
+    scrapers. At most `size` browsers exist at once; a checked-in browser
+    is reused by the next checkout, one that raised is quit rather than
+    reused, and release_idle() quits whatever is idle at the end of a run.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_uses=MAX_USES):
+        self.size = size
+        self.max_uses = max_uses
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(size)
+        self.metrics = {"launches": 0, "reuses": 0, "recycled": 0, "discarded": 0, "launch_seconds": 0.0}
+
+    def launch(self):
+        from selenium import webdriver
+
+        started = time.perf_counter()
+        driver = webdriver.Chrome(options=chrome_options())
+        with self.lock:
+            self.metrics["launches"] += 1
+            self.metrics["launch_seconds"] += time.perf_counter() - started
+        return {"driver": driver, "uses": 0}
+
+    def checkout(self):
+        with self.lock:
+            entry = self.idle.pop() if self.idle else None
+            if entry is not None:
+                self.metrics["reuses"] += 1
+        return entry or self.launch()
+
+    def checkin(self, entry):
+        entry["uses"] += 1
+        if entry["uses"] >= self.max_uses:
+            with self.lock:
+                self.metrics["recycled"] += 1
+            quit_driver(entry["driver"])
+            return
+        try:
+            # Drop the previous page so an idle browser holds as little memory as possible
+            entry["driver"].delete_all_cookies()
+            entry["driver"].get("about:blank")
+        except Exception:
+            self.discard(entry)
+            return
+        with self.lock:
+            self.idle.append(entry)
+
+    def discard(self, entry):
+        with self.lock:
+            self.metrics["discarded"] += 1
+        quit_driver(entry["driver"])
+
+    @contextmanager
+    def driver(self):
+        """Checks a driver out for the duration of a with block."""
+        self.slots.acquire()
+        try:
+            entry = self.checkout()
+            try:
+                yield entry["driver"]
+            except BaseException:
+                self.discard(entry)
+                raise
+            else:
+                self.checkin(entry)
+        finally:
+            self.slots.release()
+
+    def release_idle(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for entry in idle:
+            quit_driver(entry["driver"])
+        if self.metrics["launches"]:
+            self.log_stats()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.metrics, idle=len(self.idle))
+
+    def log_stats(self):
+        stats = self.stats()
+        print(f"Browser pool: {stats['launches']} launches ({stats['launch_seconds']:.1f}s), {stats['reuses']} reuses, {stats['recycled']} recycled, {stats['discarded']} discarded")
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"Error quitting browser: {e}")
+
+def wait_until(condition, timeout=WAIT_TIMEOUT, poll=POLL_INTERVAL):
+    """
+    Polls condition() until it returns something truthy or the timeout
+    passes, and returns its last value. Errors such as stale elements
+    count as not yet.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            value = condition()
+        except Exception:
+            value = None
+        if value or time.monotonic() >= deadline:
+            return value
+        time.sleep(poll)
+
+def wait_until_stable(read, settle=SETTLE_SECONDS, timeout=WAIT_TIMEOUT, minimum=0, poll=POLL_INTERVAL):
+    """
+    Polls read() until it has returned the same value (of at least
+    `minimum`) for `settle` seconds, or the timeout passes. Returns the
+    last value read.
+    """
+    deadline = time.monotonic() + timeout
+    last = None
+    since = time.monotonic()
+    while True:
+        try:
+            value = read()
+        except Exception:
+            value = None
+        now = time.monotonic()
+        if value != last:
+            last = value
+            since = now
+        elif value is not None and value >= minimum and now - since >= settle:
+            return value
+        if now >= deadline:
+            return last
+        time.sleep(poll)
+
+def count_elements(driver, selector):
+    return len(driver.find_elements("css selector", selector))
+
+def wait_for_count_stable(driver, selector, settle=SETTLE_SECONDS, timeout=WAIT_TIMEOUT, minimum=0):
+    """Waits until the number of elements matching selector stops changing."""
+    return wait_until_stable(lambda: count_elements(driver, selector), settle, timeout, minimum) or 0
+
+def wait_for_count_above(driver, selector, count, timeout=WAIT_TIMEOUT):
+    """Waits until more than `count` elements match selector; returns the new count."""
+    def grown():
+        current = count_elements(driver, selector)
+        return current if current > count else None
+    return wait_until(grown, timeout) or count
+
+def wait_for_network_idle(driver, settle=SETTLE_SECONDS, timeout=WAIT_TIMEOUT):
+    """
+    Waits until the document has loaded and no new resources (XHRs,
+    scripts, images) have started for `settle` seconds.
+    """
+    wait_until(lambda: driver.execute_script("return document.readyState") == "complete", timeout)
+    return wait_until_stable(lambda: driver.execute_script("return window.performance.getEntriesByType('resource').length"), settle, timeout)
+
+browsers = BrowserPool()
+atexit.register(browsers.release_idle)
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+MAX_WORKERS = int(os.environ.get('SCRAPER_MAX_WORKERS', 8))
+# Minimum gap between request starts to the same host, in seconds
+HOST_INTERVAL = float(os.environ.get('SCRAPER_HOST_INTERVAL', 0.2))
+TIMEOUT = (5, 15)
+
+CACHE_ENABLED = os.environ.get('SCRAPER_CACHE', '1') != '0'
+CACHE_DIR = os.environ.get('SCRAPER_CACHE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.http_cache'))
+# Within the TTL a cached page is served without touching the network; after it, the page is revalidated
+CACHE_TTL = int(os.environ.get('SCRAPER_CACHE_TTL', 1800))
+CACHE_MAX_BYTES = int(os.environ.get('SCRAPER_CACHE_MAX_MB', 100)) * 1024 * 1024
+
+# Replays saved pages (see benchmarks/scrapers.py): every url is sent to this local
+# stand-in instead, with the original host as the first path segment
+REPLAY_URL = os.environ.get('SCRAPER_REPLAY_URL')
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Returns the process-wide requests.Session, so every scraper shares one
+    connection pool (and keep-alive connections) per host.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=MAX_WORKERS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+    return _session
+
+class HostRateLimiter:
+    """Spaces out request starts per host across all worker threads."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class HttpCache:
+    """
+    On-disk cache of successful responses, revalidated with the ETag and
+    Last-Modified validators the server sent. An unchanged page costs a 304
+    and comes back with the same body, so the scrapers' page fingerprints
+    skip parsing it. evict() trims the least recently used entries once the
+    cache grows past max_bytes; fetch_all runs it once per crawl.
+    """
+
+    def __init__(self, directory, ttl, max_bytes):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0}
+
+    def paths(self, url):
+        name = hashlib.sha1(url.encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.json"), os.path.join(self.directory, f"{name}.body")
+
+    def load(self, url):
+        meta_path, body_path = self.paths(url)
+        try:
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            with open(body_path, 'rb') as body_file:
+                body = body_file.read()
+        except (OSError, ValueError):
+            return None, None
+        os.utime(meta_path)
+        return meta, body
+
+    def store(self, url, response, meta=None, body=None):
+        meta_path, body_path = self.paths(url)
+        meta = dict(meta or {}, url=url, storedAt=time.time())
+        if body is None:
+            body = response.content
+            meta["headers"] = dict(response.headers)
+            meta["etag"] = response.headers.get('ETag')
+            meta["lastModified"] = response.headers.get('Last-Modified')
+        # Created on first write so importing the scrapers doesn't touch the disk
+        os.makedirs(self.directory, exist_ok=True)
+        for path, data, mode in [(body_path, body, 'wb'), (meta_path, json.dumps(meta), 'w')]:
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, mode) as output:
+                output.write(data)
+            os.replace(temporary, path)
+
+    def evict(self):
+        with self.lock:
+            entries = []
+            total = 0
+            if not os.path.isdir(self.directory):
+                return
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.json'):
+                    body_path = entry.path[:-len('.json')] + '.body'
+                    size = entry.stat().st_size + (os.path.getsize(body_path) if os.path.exists(body_path) else 0)
+                    entries.append((entry.stat().st_mtime, entry.path, body_path, size))
+                    total += size
+            for _, meta_path, body_path, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                for path in (meta_path, body_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                self.counters["evictions"] += 1
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def get(self, url, timeout):
+        meta, body = self.load(url)
+        if meta is not None and time.time() - meta["storedAt"] < self.ttl:
+            self.count("hits")
+            return cached_response(url, meta, body)
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers['If-None-Match'] = meta["etag"]
+            if meta.get("lastModified"):
+                headers['If-Modified-Since'] = meta["lastModified"]
+
+        limiter.wait(url)
+        response = get_session().get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and meta is not None:
+            self.count("revalidated")
+            self.store(url, response, meta=meta, body=body)
+            return cached_response(url, meta, body)
+
+        response.raise_for_status()
+        self.count("misses")
+        self.store(url, response)
+        return response
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
+
+def cached_response(url, meta, body):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.from_cache = True
+    return response
+
+limiter = HostRateLimiter(HOST_INTERVAL)
+cache = HttpCache(CACHE_DIR, CACHE_TTL, CACHE_MAX_BYTES) if CACHE_ENABLED else None
+
+def replay_url(url):
+    parts = urlsplit(url)
+    base = urlsplit(REPLAY_URL)
+    return urlunsplit((base.scheme, base.netloc, f"/{parts.netloc}{parts.path}", parts.query, ''))
+
+def fetch(url, timeout=TIMEOUT):
+    """GETs a url through the shared session and cache, raising for HTTP errors."""
+    if REPLAY_URL:
+        url = replay_url(url)
+    if cache is not None:
+        return cache.get(url, timeout)
+    limiter.wait(url)
+    response = get_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+def log_cache_stats():
+    if cache is not None:
+        stats = cache.stats()
+        print(f"HTTP cache: {stats['hits']} hits, {stats['revalidated']} revalidated (304), {stats['misses']} misses, {stats['evictions']} evictions")
+
+def fetch_or_error(url):
+    try:
+        return fetch(url)
+    except requests.RequestException as e:
+        return e
+
+def fetch_all(urls, max_workers=MAX_WORKERS):
+    """
+    Fetches urls concurrently on a bounded thread pool. Returns a dict of
+    url to either the response or the RequestException it raised, in the
+    order the urls were given.
+    """
+    urls = list(urls)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(fetch_or_error, urls))
+    if cache is not None:
+        # Once per crawl rather than per response, since it stats the whole cache directory
+        cache.evict()
+    return dict(zip(urls, results))
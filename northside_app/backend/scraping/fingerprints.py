@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import hashlib
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from backend.models.SourcePage import SourcePage
+
+class PageTracker:
+    """
+    Tracks the source pages a refresh reads. Pages whose content matches the
+    fingerprint stored by the last successful refresh can be skipped before
+    parsing; their records are left as they are. Fingerprints are only
+    saved by commit(), after the refresh's records have been written.
+    """
+
+    def __init__(self):
+        self.stored = {page['url']: page['fingerprint'] for page in SourcePage._get_collection().find({}, {'url': 1, 'fingerprint': 1})}
+        self.changed_pages = {}
+        self.unchanged = []
+        self.failed = []
+
+    def changed(self, url, content):
+        if isinstance(content, str):
+            content = content.encode()
+        fingerprint = hashlib.sha1(content).hexdigest()
+        if self.stored.get(url) == fingerprint:
+            self.unchanged.append(url)
+            return False
+        self.changed_pages[url] = fingerprint
+        return True
+
+    def fail(self, url):
+        self.changed_pages.pop(url, None)
+        self.failed.append(url)
+
+    def keep(self):
+        # Sources whose stored records must survive this refresh
+        return self.unchanged + self.failed
+
+    def commit(self):
+        if not self.changed_pages:
+            return
+        now = datetime.now()
+        SourcePage._get_collection().bulk_write([
+            UpdateOne({'url': url}, {'$set': {'fingerprint': fingerprint, 'checkedAt': now}}, upsert=True)
+            for url, fingerprint in self.changed_pages.items()
+        ])
@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from backend.models.CrawlTarget import CrawlTarget
+
+# Urls that returned nothing are only re-probed on this cadence
+RETRY_MISSES_AFTER = timedelta(days=int(os.environ.get('FRONTIER_RETRY_DAYS', 7)))
+# A url that returned data is only demoted after this many empty parses in a row, since
+# a markup change or a bot challenge page also parses to nothing
+EMPTY_PARSES_BEFORE_MISS = int(os.environ.get('FRONTIER_EMPTY_PARSES', 3))
+
+class CrawlFrontier:
+    """
+    Remembers which candidate urls returned data. Hits are crawled every
+    run; misses are skipped until RETRY_MISSES_AFTER has passed since they
+    were last checked. A 404 is a miss straight away, an empty page only
+    after EMPTY_PARSES_BEFORE_MISS in a row. Results are saved by commit().
+    """
+
+    def __init__(self):
+        self.known = {target['url']: target for target in CrawlTarget._get_collection().find({}, {'_id': 0})}
+        self.results = {}
+
+    def is_due(self, url, now=None):
+        target = self.known.get(url)
+        if target is None or target['found']:
+            return True
+        return target['checkedAt'] <= (now or datetime.now()) - RETRY_MISSES_AFTER
+
+    def due(self, urls):
+        now = datetime.now()
+        return [url for url in urls if self.is_due(url, now)]
+
+    def record(self, url, found=None):
+        # found=None marks the url checked without changing what we knew about it
+        target = self.known.get(url, {})
+        if found is None:
+            self.results[url] = (target.get('found', True), target.get('emptyParses', 0))
+        else:
+            self.results[url] = (found, 0)
+
+    def record_empty(self, url):
+        """
+        Records a page that loaded but parsed to nothing. Returns True once
+        the url counts as a miss; until then the caller should treat the
+        page as failed and keep its records.
+        """
+        target = self.known.get(url)
+        if target is None or not target['found']:
+            self.results[url] = (False, 0)
+            return True
+        empty_parses = target.get('emptyParses', 0) + 1
+        missed = empty_parses >= EMPTY_PARSES_BEFORE_MISS
+        self.results[url] = (not missed, 0 if missed else empty_parses)
+        return missed
+
+    def commit(self):
+        if not self.results:
+            return
+        now = datetime.now()
+        operations = []
+        for url, (found, empty_parses) in self.results.items():
+            update = {'$set': {'found': found, 'emptyParses': empty_parses, 'checkedAt': now}}
+            if found:
+                update['$set']['foundAt'] = now
+            operations.append(UpdateOne({'url': url}, update, upsert=True))
+        CrawlTarget._get_collection().bulk_write(operations)
+        hits = sum(1 for found, _ in self.results.values() if found)
+        print(f"Crawl frontier updated: {hits} hits, {len(self.results) - hits} misses")
@@ -2,66 +2,88 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from bs4 import BeautifulSoup
 import requests
 from datetime import datetime
 
 from backend.models.GeneralEvent import GeneralEvent
-from mongoengine import connect
-from dotenv import load_dotenv
+from backend.ingest import sync_collection
+from backend.scraping.fingerprints import PageTracker
+from backend.scraping.fetch import fetch_all, log_cache_stats
+from backend.scraping.parsing import parse_html
+from backend.database import connect_db
+
+ORIGIN = "Northside Prep School Calendar"
+
+def calendar_months():
+    return [
+        (month_num, year_num, f"https://www.northsideprep.org/apps/events/view_calendar.jsp?id=0&m={month_num-1}&y={year_num}")
+        for month_num in range(1, 13)
+        for year_num in range(2025, 2027)
+    ]
+
+def parse_calendar_month(html_content, month_num, year_num, url):
+    """Returns an event record for each event on one month of the school calendar."""
+    soup = parse_html(html_content)
+    event_cells = soup.find_all('div', class_='day prev') + soup.find_all('div', class_='day prev weekend')
+
+    events = []
+    for cell in event_cells:
+        event_name = cell.find("a", class_="eventInfoAnchor")
+        if event_name:
+            event_name = event_name.text.strip()
+            event_date = cell.find("span", class_="dayLabel").text.strip()
+            event_date = f"{month_num}/{event_date}/{year_num}"
+            event_time = cell.find("span", class_="edEventDate").text.strip() if cell.find("span", class_="edEventDate") else "All Day"
+
+            events.append({
+                "date": event_date,
+                "time": event_time,
+                "name": event_name,
+                "createdBy": ORIGIN,
+                "source": url
+            })
+    return events
 
 def update_general_events():
     print("===Updating general events===")
 
     try:
-        load_dotenv()
-        connect(host=os.environ['MONGODB_URL'])
+        connect_db()
     except Exception as e:
         print(f"Error connecting to the database: {e}")
 
     
     schedule = []
+    pages = PageTracker()
     
-    origin = "Northside Prep School Calendar"
-    
-    for month_num in range(1, 13):
-        for year_num in range(2025, 2027):
-            url = f"https://www.northsideprep.org/apps/events/view_calendar.jsp?id=0&m={month_num-1}&y={year_num}"
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-            except requests.RequestException as e:
-                print(f"Error fetching {url}: {e}")
-                continue
-
-            html_content = response.content
-
-            soup = BeautifulSoup(html_content, 'html.parser')
-            event_cells = soup.find_all('div', class_='day prev') + soup.find_all('div', class_='day prev weekend')
-
-            for cell in event_cells:
-                event_name = cell.find("a", class_="eventInfoAnchor")
-                if event_name:
-                    event_name = event_name.text.strip()
-                    event_date = cell.find("span", class_="dayLabel").text.strip()
-                    event_date = f"{month_num}/{event_date}/{year_num}"
-                    event_time = cell.find("span", class_="edEventDate").text.strip() if cell.find("span", class_="edEventDate") else "All Day"
-
-                    schedule.append({
-                        "date": event_date,
-                        "time": event_time,
-                        "name": event_name,
-                        "createdBy": origin
-                    })
-
-    if GeneralEvent.objects.count() == len(schedule) or len(schedule) == 0:
-        print("No new events to add, skipping update.")
-        return
-    else:
-        GeneralEvent.drop_collection()
-        for event_data in schedule:
-            event = GeneralEvent(**event_data)
-            event.save()
-        print(f"General schedule updated: {len(schedule)} events processed")
-
-update_general_events()
\ No newline at end of file
+    months = calendar_months()
+    # Unchanged months come back from the HTTP cache with the same body, so they are skipped before parsing
+    responses = fetch_all(url for _, _, url in months)
+
+    for month_num, year_num, url in months:
+        response = responses[url]
+        if isinstance(response, requests.RequestException):
+            print(f"Error fetching {url}: {response}")
+            pages.fail(url)
+            continue
+
+        html_content = response.content
+        if not pages.changed(url, html_content):
+            continue
+
+        schedule += parse_calendar_month(html_content, month_num, year_num, url)
+
+    if not schedule and not pages.unchanged:
+        print("No events found, skipping update.")
+        return False
+
+    # Submitted events share the collection, so only calendar events from re-parsed months are in scope
+    counts = sync_collection(GeneralEvent, schedule, {'createdBy': ORIGIN, 'source': {'$nin': pages.keep()}})
+    pages.commit()
+    log_cache_stats()
+
+    print(f"General schedule updated: {counts['inserted']} inserted, {counts['updated']} updated, {counts['deleted']} deleted, {counts['unchanged']} unchanged")
+    return counts['inserted'] + counts['updated'] + counts['deleted'] > 0
+
+if __name__ == '__main__':
+    update_general_events()
@@ -0,0 +1,12 @@
+import os
+from importlib.util import find_spec
+
+from bs4 import BeautifulSoup
+
+# lxml builds the tree in C and is several times faster than the pure-Python
+# html.parser on the long schedule page; SCRAPER_HTML_PARSER forces either one
+PARSER = os.environ.get('SCRAPER_HTML_PARSER') or ('lxml' if find_spec('lxml') else 'html.parser')
+
+def parse_html(html_content):
+    """Parses a page with the configured BeautifulSoup backend."""
+    return BeautifulSoup(html_content, PARSER)
@@ -0,0 +1,11 @@
+import time
+from contextlib import contextmanager
+
+@contextmanager
+def phase(name):
+    """Logs how long the wrapped block took."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        print(f"[timing] {name}: {time.perf_counter() - started:.2f}s")
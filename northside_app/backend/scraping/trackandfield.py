@@ -2,222 +2,340 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from bs4 import BeautifulSoup
 import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-import time
 from datetime import datetime
-import pandas as pd
+import json
+from typing import NamedTuple
 
-from mongoengine import connect
-from dotenv import load_dotenv
+from backend.database import connect_db
+
+from backend.scraping.browser import browsers, count_elements, wait_until, wait_for_count_stable, wait_for_network_idle, WAIT_TIMEOUT
+from backend.scraping.timing import phase
+from backend.scraping.parsing import parse_html
 
 sports = ['cross-country', 'track-and-field-outdoor', 'track-and-field-indoor']
 
-def update_track_and_field_schedule():
-    df = pd.DataFrame(columns=["name", "date", "time", "gender", "sport", "level", "opponent", "location", "home"])
+EVENT_SELECTOR = "div.px-2.w-100.d-flex.pointer"
+OPEN_ITEM_SELECTOR = 'div[class*="item-open"]'
+OPEN_VENUE_SELECTOR = 'div[class*="item-open"] meet-venue-link a'
+ROSTER_SELECTOR = "div.col-6.ng-star-inserted span.text-truncate"
+# Longest to wait for a clicked meet to open or close, in seconds
+CLICK_WAIT = float(os.environ.get('TRACK_CLICK_WAIT', 3))
+# "auto" reads meets from the data the page loaded and falls back to clicking each one for its venue;
+# "json" and "click" force one path
+EXTRACTION_MODE = os.environ.get('ATHLETIC_NET_MODE', 'auto')
+
+NAME_KEYS = ['MeetName', 'meetName', 'Name', 'name']
+DATE_KEYS = ['StartDate', 'startDate', 'MeetDate', 'meetDate', 'Date', 'date']
+LOCATION_KEYS = ['Location', 'location', 'LocationName', 'locationName', 'Venue', 'venue', 'VenueName', 'venueName']
+
+API_RESPONSES_SCRIPT = """
+return window.performance.getEntriesByType('resource')
+    .filter(entry => entry.initiatorType === 'xmlhttprequest' || entry.initiatorType === 'fetch')
+    .map(entry => entry.name)
+    .filter(name => name.indexOf('/api/') !== -1);
+"""
+FETCH_SCRIPT = """
+const done = arguments[arguments.length - 1];
+fetch(arguments[0], {credentials: 'include'}).then(response => response.text()).then(done).catch(() => done(null));
+"""
+
+class MeetRecord(NamedTuple):
+    """An athletics_schedule row for one gender at a meet."""
+    name: str
+    date: str
+    time: str
+    gender: str
+    sport: str
+    level: str
+    opponent: str
+    location: str
+    home: bool
+    source: str
+
+class TrackAthlete(NamedTuple):
+    """An athletes row for one runner on an athletic.net roster."""
+    name: str
+    number: int
+    sport: str
+    season: str
+    level: str
+    gender: str
+    grade: str
+    position: str
+    source: str
+
+def meet_records(sport, url, names, dates, locations):
+    """Yields a row per gender named in each meet, or one for each gender when it names neither."""
+    for name, date, location in zip(names, dates, locations):
+        if "girls" in name.lower():
+            genders = ["Girls"]
+        elif "boys" in name.lower():
+            genders = ["Boys"]
+        else:
+            genders = ["girls", "boys"]
+        for gender in genders:
+            yield MeetRecord(name, date, "All Day", gender, sport, "varsity", "Multiple Schools", location, False, url)
+
+def calendar_titles(page_source):
+    """The meet names on the calendar cards the page rendered."""
+    soup = parse_html(page_source)
+    return [title.get_text(strip=True) for title in soup.select(f"{EVENT_SELECTOR} span.title")]
+
+def matches_calendar(meets, titles, card_count):
+    """
+    Whether meets read from the page's data can stand in for its calendar:
+    the same number of meets as cards, or every meet named on a card. No
+    cards at all usually means the page failed to render.
+    """
+    if not card_count:
+        return False
+    if len(meets) == card_count:
+        return True
+    rendered = {title.lower() for title in titles}
+    return all(meet["name"].lower() in rendered for meet in meets)
+
+def page_json(driver):
+    """
+    Returns the JSON the page has already loaded: state embedded in
+    <script type="application/json"> tags, and the API responses it
+    fetched (re-read in the page, so they usually come from its cache).
+    """
+    from selenium.webdriver.common.by import By
+
+    texts = [script.get_attribute('innerHTML') for script in driver.find_elements(By.CSS_SELECTOR, 'script[type="application/json"]')]
+    for api_url in driver.execute_script(API_RESPONSES_SCRIPT) or []:
+        texts.append(driver.execute_async_script(FETCH_SCRIPT, api_url))
+
+    payloads = []
+    for text in texts:
+        try:
+            payloads.append(json.loads(text))
+        except (TypeError, ValueError):
+            continue
+    return payloads
+
+def first_value(item, keys):
+    for key in keys:
+        value = item.get(key)
+        if isinstance(value, dict):
+            value = first_value(value, NAME_KEYS)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+def find_meets(payload):
+    """Walks a JSON payload for objects that look like meets: a meet id or name, a name and a date."""
+    meets = []
+    stack = [payload]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(reversed(item))
+            continue
+        if not isinstance(item, dict):
+            continue
+        stack.extend(reversed(list(item.values())))
+
+        if not any('meet' in key.lower() for key in item):
+            continue
+        name = first_value(item, NAME_KEYS)
+        date = first_value(item, DATE_KEYS)
+        if not name or not date:
+            continue
+        try:
+            # API dates are ISO timestamps; store them the way the athletics site writes dates
+            date = datetime.strptime(date[:10], '%Y-%m-%d').strftime('%b %d %Y')
+        except ValueError:
+            pass
+        meets.append({"name": name, "date": date, "location": first_value(item, LOCATION_KEYS) or "Location not found"})
+    return meets
+
+def extract_meets(driver):
+    try:
+        payloads = page_json(driver)
+    except Exception as e:
+        print(f"Error reading the page's data: {e}")
+        return []
+
+    meets = {}
+    for payload in payloads:
+        for meet in find_meets(payload):
+            meets.setdefault((meet["name"], meet["date"]), meet)
+    return list(meets.values())
+
+def update_track_and_field_schedule(pages):
+    """Yields a MeetRecord for each meet on the team's athletic.net calendars."""
+    # Selenium takes a while to import, so only the scrape pays for it
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    try:
+        connect_db()
+    except Exception as e:
+        print(f"Error connecting to the database: {e}")
+
     for sport in sports:
         for year in [2025, 2026]:
             names = []
             dates = []
-            try:
-                load_dotenv()
-                connect(host=os.environ['MONGODB_URL'])
-            except Exception as e:
-                print(f"Error connecting to the database: {e}")
             url = f"https://www.athletic.net/team/19718/{sport}/{year}"
 
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--window-size=1920,1080")
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.get(url)
+            with browsers.driver() as driver:
+                driver.get(url)
 
-            wait = WebDriverWait(driver, 20)
+                wait = WebDriverWait(driver, WAIT_TIMEOUT)
             
-            print("Waiting for events to load...")
-            time.sleep(10)
-            
-            selectors_to_try = [
-                "div.px-2.w-100.d-flex.pointer",
-                "div[class*='px-2'][class*='pointer']",
-                "div.cal-item[class*='ng-tns']",
-                "[class*='cal-item'][class*='ng-star-inserted']"
-            ]
+                print("Waiting for events to load...")
+                with phase(f"{sport} {year} page load"):
+                    wait_for_network_idle(driver)
+                    card_count = wait_for_count_stable(driver, EVENT_SELECTOR)
+
+                if not pages.changed(url, driver.page_source):
+                    print(f"{url} unchanged since the last refresh, skipping")
+                    continue
             
-            clickable_events = []
-            for selector in selectors_to_try:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        print(f"Found {len(elements)} elements with selector: {selector}")
-                        clickable_events = elements
-                        break
-                except Exception as e:
-                    print(f"Selector {selector} failed: {e}")
+                meets = []
+                if EXTRACTION_MODE != "click":
+                    with phase(f"{sport} {year} meet data extraction"):
+                        meets = extract_meets(driver)
+                    # find_meets is a heuristic, so the payload may be partial or unrelated;
+                    # clicking is the safe path unless it lines up with the rendered calendar
+                    if EXTRACTION_MODE == "auto" and meets and not matches_calendar(meets, calendar_titles(driver.page_source), card_count):
+                        print(f"Page data has {len(meets)} meets that don't match the {card_count} on the calendar, falling back to venue clicks")
+                        meets = []
+
+                if meets:
+                    print(f"Found {len(meets)} meets in the page's data, skipping venue clicks")
+                    names = [meet["name"] for meet in meets]
+                    dates = [meet["date"] for meet in meets]
+                    locations = [meet["location"] for meet in meets]
+                elif EXTRACTION_MODE == "json":
+                    print("No meet data found in the page")
+                    pages.fail(url)
                     continue
+                else:
+                    selectors_to_try = [
+                        "div.px-2.w-100.d-flex.pointer",
+                        "div[class*='px-2'][class*='pointer']",
+                        "div.cal-item[class*='ng-tns']",
+                        "[class*='cal-item'][class*='ng-star-inserted']"
+                    ]
             
-            if not clickable_events:
-                print("No clickable events found with any selector")
-                driver.quit()
-                continue
+                    clickable_events = []
+                    for selector in selectors_to_try:
+                        try:
+                            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                            if elements:
+                                print(f"Found {len(elements)} elements with selector: {selector}")
+                                clickable_events = elements
+                                break
+                        except Exception as e:
+                            print(f"Selector {selector} failed: {e}")
+                            continue
+            
+                    if not clickable_events:
+                        print("No clickable events found with any selector")
+                        pages.fail(url)
+                        continue
+
+                    soup = parse_html(driver.page_source)
+                    events = soup.select(EVENT_SELECTOR)
+                    names = [event.find('span', class_="title").get_text(strip=True) for event in events if event.find('span', class_="title")]
+                    dates = [event.find('small', class_="date").get_text(strip=True) for event in events if event.find('small', class_="date")]
 
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            events = soup.select('div.px-2.w-100.d-flex.pointer')
-            for event in events:
-                if event.find('span', class_="title"):
-                    name = event.find('span', class_="title").get_text(strip=True)
-                if event.find('small', class_="date"):
-                    dates.append(event.find('small', class_="date").get_text(strip=True))
-                boy_or_girl = event.find('img')
-                if event.find('img'):
-                    if 'Girls' in boy_or_girl.get('ngbtooltip'):
-                        names.append(name + " - Girls")
-                    elif 'Boys' in boy_or_girl.get('ngbtooltip'):
-                        names.append(name + " - Boys")
-
-            names = [event.find('span', class_="title").get_text(strip=True) for event in events if event.find('span', class_="title")]
-            dates = [event.find('small', class_="date").get_text(strip=True) for event in events if event.find('small', class_="date")]
-
-            locations = []
-            print(f"Found {len(clickable_events)} clickable events")
+                    locations = []
+                    print(f"Found {len(clickable_events)} clickable events")
             
-            for i, clickable_event in enumerate(clickable_events):
-                try:
-                    print(f"Attempting to click event {i+1}")
+                    with phase(f"{sport} {year} venue lookups ({len(clickable_events)} events)"):
+                        for i, clickable_event in enumerate(clickable_events):
+                            try:
+                                print(f"Attempting to click event {i+1}")
                     
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", clickable_event)
-                    time.sleep(2)
+                                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", clickable_event)
                     
-                    wait.until(EC.element_to_be_clickable(clickable_event))
+                                wait.until(EC.element_to_be_clickable(clickable_event))
                     
-                    try:
-                        clickable_event.click()
-                    except Exception as click_error:
-                        print(f"Regular click failed, trying JavaScript click: {click_error}")
-                        driver.execute_script("arguments[0].click();", clickable_event)
+                                try:
+                                    clickable_event.click()
+                                except Exception as click_error:
+                                    print(f"Regular click failed, trying JavaScript click: {click_error}")
+                                    driver.execute_script("arguments[0].click();", clickable_event)
                     
-                    time.sleep(3)
+                                # The venue renders into the opened item; events without one give up at the cap
+                                wait_until(lambda: count_elements(driver, OPEN_VENUE_SELECTOR), timeout=CLICK_WAIT)
                     
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
+                                soup = parse_html(driver.page_source)
                     
-                    location_selectors = [
-                        'div.cal-item.ng-tns-c342766986-3.ng-star-inserted.item-open',
-                        'div[class*="item-open"]',
-                        'div[class*="cal-item"][class*="item-open"]'
-                    ]
+                                location_selectors = [
+                                    'div.cal-item.ng-tns-c342766986-3.ng-star-inserted.item-open',
+                                    'div[class*="item-open"]',
+                                    'div[class*="cal-item"][class*="item-open"]'
+                                ]
                     
-                    location_found = False
-                    for loc_selector in location_selectors:
-                        open_events = soup.select(loc_selector)
-                        if open_events:
-                            print(f"Found open event with selector: {loc_selector}")
-                            for event in open_events:
-                                location_link = event.find('meet-venue-link')
-                                location_link = location_link.find('a')
-                                if location_link:
-                                    location = location_link.get_text(strip=True)
-                                    locations.append(location)
-                                    print(f"Found location: {location}")
-                                    location_found = True
-                            break
+                                location_found = False
+                                for loc_selector in location_selectors:
+                                    open_events = soup.select(loc_selector)
+                                    if open_events:
+                                        print(f"Found open event with selector: {loc_selector}")
+                                        for event in open_events:
+                                            location_link = event.find('meet-venue-link')
+                                            location_link = location_link.find('a')
+                                            if location_link:
+                                                location = location_link.get_text(strip=True)
+                                                locations.append(location)
+                                                print(f"Found location: {location}")
+                                                location_found = True
+                                        break
                     
-                    if not location_found:
-                        print("No location found for this event")
-                        locations.append("Location not found")
+                                if not location_found:
+                                    print("No location found for this event")
+                                    locations.append("Location not found")
                     
-                    try:
-                        driver.execute_script("document.body.click();")
-                        time.sleep(1)
-                    except:
-                        pass
-
-                except Exception as e:
-                    print(f"Error clicking event {i+1}: {e}")
-                    locations.append("Error retrieving location")
-
-            # print(names)
-            # print(dates)
-            # print(locations)
-            for name in names:
-                if "girls" in name.lower():
-                    new_row = pd.DataFrame({
-                        "name": [name],
-                        "date": [dates[names.index(name)]],
-                        "time": ["All Day"],
-                        "gender": ["Girls"],
-                        "sport": [sport],
-                        "level": ["varsity"],
-                        "opponent": ["Multiple Schools"],
-                        "location": [locations[names.index(name)]],
-                        "home": [False],
-                    })
-                elif "boys" in name.lower():
-                    new_row = pd.DataFrame({
-                        "name": [name],
-                        "date": [dates[names.index(name)]],
-                        "time": ["All Day"],
-                        "gender": ["Boys"],
-                        "sport": [sport],
-                        "level": ["varsity"],
-                        "opponent": ["Multiple Schools"],
-                        "location": [locations[names.index(name)]],
-                        "home": [False],
-                    })
-                else:
-                    new_row = pd.DataFrame({
-                        "name": [name]*2,
-                        "date": [dates[names.index(name)]]*2,
-                        "time": ["All Day"]*2,
-                        "gender": ["girls", "boys"],
-                        "sport": [sport]*2,
-                        "level": ["varsity"]*2,
-                        "opponent": ["Multiple Schools"]*2,
-                        "location": [locations[names.index(name)]]*2,
-                        "home": [False]*2,
-                    })
-                
-                df = pd.concat([df, new_row], ignore_index=True)
+                                try:
+                                    driver.execute_script("document.body.click();")
+                                    wait_until(lambda: not count_elements(driver, OPEN_ITEM_SELECTOR), timeout=CLICK_WAIT)
+                                except:
+                                    pass
 
-    return df
+                            except Exception as e:
+                                print(f"Error clicking event {i+1}: {e}")
+                                locations.append("Error retrieving location")
+
+            yield from meet_records(sport, url, names, dates, locations)
 
 # update_track_and_field_schedule()
 
-def update_track_and_field_roster():
+def update_track_and_field_roster(pages):
+    """Yields a TrackAthlete for each athlete on the team's athletic.net rosters."""
     print("===Updating track and field roster===")
     try:
-        load_dotenv()
-        connect(host=os.environ['MONGODB_URL'])
+        connect_db()
     except Exception as e:
         print(f"Error connecting to the database: {e}")
         return
 
-    df = pd.DataFrame(columns=["name", "number", "sport", "season", "level", "gender", "grade", "position"])
-
     for sport in sports:
         url = f"https://www.athletic.net/team/19718/{sport}"
         try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--window-size=1920,1080")
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.get(url)
-
-            print("Waiting for the page to load...")
-            time.sleep(10)
-
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            with browsers.driver() as driver:
+                driver.get(url)
+
+                print("Waiting for the page to load...")
+                with phase(f"{sport} roster page load"):
+                    wait_for_network_idle(driver)
+                    wait_for_count_stable(driver, ROSTER_SELECTOR)
+                page_source = driver.page_source
+
+            if not pages.changed(url, page_source):
+                print(f"{url} unchanged since the last refresh, skipping")
+                continue
+
+            soup = parse_html(page_source)
         except Exception as e:
             print(f"Error parsing HTML content: {e}")
+            pages.fail(url)
             continue
 
         columns = soup.find_all('div', class_='col-6 ng-star-inserted')
@@ -241,26 +359,4 @@ def update_track_and_field_roster():
                 # For now, we'll assume varsity since the site doesn't clearly distinguish levels
                 athlete_level = "varsity"  # Default to varsity
                 
-                new_row = pd.DataFrame({
-                    "name": [athlete],
-                    "number": [0],
-                    "sport": [sport],
-                    "season": [season],
-                    "level": [athlete_level],
-                    "gender": [gender],
-                    "grade": ["N/A"],
-                    "position": ["N/A"]
-                })
-                df = pd.concat([df, new_row], ignore_index=True)
-
-    return df
-
-# returned_df = update_track_and_field_schedule()
-
-# print(returned_df.head(15))
-# print(returned_df.tail(15))
-
-# returned_df = update_track_and_field_roster()
-
-# print(returned_df.head(15))
-# print(returned_df.tail(15))
\ No newline at end of file
+                yield TrackAthlete(athlete, 0, sport, season, athlete_level, gender, "N/A", "N/A", url)
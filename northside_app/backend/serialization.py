@@ -0,0 +1,84 @@
+import calendar
+import json
+from datetime import datetime
+
+from bson import ObjectId, json_util
+from bson.json_util import LEGACY_JSON_OPTIONS
+
+# In requirements.txt; the fallback keeps a bare checkout on the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def datetime_to_millis(value):
+    # As json_util does: aware datetimes are shifted to UTC, naive ones are taken as UTC
+    if value.utcoffset() is not None:
+        value = value - value.utcoffset()
+    return calendar.timegm(value.timetuple()) * 1000 + value.microsecond // 1000
+
+def default(value):
+    # The same extended JSON QuerySet.to_json() writes, which the app parses
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    if isinstance(value, datetime):
+        return {"$date": datetime_to_millis(value)}
+    return json_util.default(value, LEGACY_JSON_OPTIONS)
+
+_encoder = json.JSONEncoder(default=default)
+
+# Ingest bookkeeping (the content hash, the page a record was scraped from) and the
+# parsed dates behind the from/to filters; the app never reads them
+INTERNAL_FIELDS = {'contentHash', 'source', 'parsed_date', 'parsed_start_date', 'parsed_end_date'}
+COMPACT_DROPPED = {'_id'} | INTERNAL_FIELDS
+
+def public(row):
+    """A raw document without its internal fields."""
+    return {key: value for key, value in row.items() if key not in INTERNAL_FIELDS}
+
+def compact(rows):
+    """
+    The format=compact body: column names once, then each row as a list of
+    values in column order. String columns whose values repeat (sport,
+    level, location...) are dictionary-encoded: their distinct values go
+    in "dicts" and rows hold indexes into that list. Datetimes are epoch
+    milliseconds, and ids and bookkeeping fields are dropped.
+    """
+    columns = []
+    for row in rows:
+        for key in row:
+            if key not in COMPACT_DROPPED and key not in columns:
+                columns.append(key)
+
+    table = []
+    for row in rows:
+        values = [row.get(column) for column in columns]
+        table.append([datetime_to_millis(value) if isinstance(value, datetime) else value for value in values])
+
+    dicts = {}
+    for i, column in enumerate(columns):
+        values = [row[i] for row in table if row[i] is not None]
+        if not values or not all(isinstance(value, str) for value in values):
+            continue
+        distinct = sorted(set(values))
+        # Only worth it when an index is usually shorter than repeating the string
+        if len(distinct) * 2 > len(values):
+            continue
+        index = {value: position for position, value in enumerate(distinct)}
+        for row in table:
+            if row[i] is not None:
+                row[i] = index[row[i]]
+        dicts[column] = distinct
+
+    return {"format": "compact", "columns": columns, "dicts": dicts, "rows": table}
+
+def dumps(rows):
+    """
+    Encodes raw pymongo documents (from as_pymongo()) to extended JSON.
+    json_util.dumps walks and copies every value in Python before encoding;
+    here orjson (or the stdlib C encoder without it) does the walk and only
+    ObjectIds and datetimes reach Python.
+    """
+    if orjson is not None:
+        return orjson.dumps(rows, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return _encoder.encode(rows)
@@ -1,42 +1,63 @@
-from bs4 import BeautifulSoup
-import requests
-    
-url = "https://www.maxpreps.com/il/chicago/northside-mustangs/"
-    
-try:
-        response = requests.get(url)
-        html_content = response.text
-        soup = BeautifulSoup(html_content, 'html.parser')
-except Exception as e:
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.scraping.fetch import fetch, fetch_all
+from backend.scraping.parsing import parse_html
+
+BASE_URL = "https://www.maxpreps.com/il/chicago/northside-mustangs/"
+
+GENDERS = ["girls", "boys"]
+SEASONS = ["fall", "winter", "spring"]
+LEVELS = ["varsity", "jv", "freshman"]
+
+def discover_sports():
+    """Returns the sport slugs listed on the school's MaxPreps page."""
+    try:
+        response = fetch(BASE_URL)
+        soup = parse_html(response.text)
+    except Exception as e:
         print(f"Error parsing HTML content: {e}")
-    
-sports = soup.find_all('span', class_="sport-name")
-sports = [sport.get_text(strip=True).replace("& ", "").replace(" ", "-").lower() for sport in sports]
-sports = list(set(sports))
-
-genders = ["girls", "boys"]
-seasons = ["fall", "winter", "spring"]
-level = "varsity"
-
-sports_data = []
-
-for sport in sports:
-        for gender in genders:
-            for season in seasons:
-                    url = f"https://www.maxpreps.com/il/chicago/northside-mustangs/{sport}/{gender}/{level}/{season}/roster/"
-                    # url = f"https://www.maxpreps.com/il/chicago/northside-mustangs/{sport}/{gender}/{level}/{season}/24-25/roster/"
-                    try:
-                        response = requests.get(url, timeout=(10, 30))
-                        response.raise_for_status()
-                    except requests.RequestException as e:
-                        print(f"Error fetching {url}: {e}")
-                        continue
-
-                    sports_data.append({
-                        "sport": sport,
-                        "season": season,
-                        "gender": gender
-                    })
-
-print(sports_data)
+        return []
+
+    sports = soup.find_all('span', class_="sport-name")
+    sports = [sport.get_text(strip=True).replace("& ", "").replace(" ", "-").lower() for sport in sports]
+    return list(set(sports))
+
+def discover_teams(sports, levels=LEVELS):
+    """
+    Returns every candidate roster page for the given sports. Most of these
+    don't exist; the crawl frontier learns which ones do.
+    """
+    return [
+        {
+            "sport": sport,
+            "gender": gender,
+            "season": season,
+            "level": level,
+            "url": f"{BASE_URL}{sport}/{gender}/{level}/{season}/roster/"
+            # "url": f"{BASE_URL}{sport}/{gender}/{level}/{season}/24-25/roster/"
+        }
+        for sport in sports
+        for gender in GENDERS
+        for season in SEASONS
+        for level in levels
+    ]
+
+if __name__ == '__main__':
+    teams = discover_teams(discover_sports(), levels=["varsity"])
+    responses = fetch_all(team["url"] for team in teams)
+
+    sports_data = []
+    for team in teams:
+        response = responses[team["url"]]
+        if isinstance(response, Exception):
+            print(f"Error fetching {team['url']}: {response}")
+            continue
+        sports_data.append({
+            "sport": team["sport"],
+            "season": team["season"],
+            "gender": team["gender"]
+        })
 
+    print(sports_data)
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import mongoengine
+import mongomock
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def db():
+    """A fresh in-memory database registered as mongoengine's default connection."""
+    mongoengine.disconnect()
+    mongoengine.connect('test', mongo_client_class=mongomock.MongoClient)
+    yield
+    mongoengine.disconnect()
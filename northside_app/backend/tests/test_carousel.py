@@ -0,0 +1,86 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import carousel
+from ingest import sync_collection
+from models.AthleticsSchedule import AthleticsSchedule
+from models.CarouselSnapshot import CarouselSnapshot
+from models.Lease import Lease
+
+@pytest.fixture
+def rebuilds(db, monkeypatch):
+    Lease.ensure_indexes()
+    monkeypatch.setattr(carousel, 'FIRST_BUILD_WAIT', 2)
+    calls = []
+    refresh = carousel.refresh_carousel
+    def counted():
+        calls.append(1)
+        return refresh()
+    monkeypatch.setattr(carousel, 'refresh_carousel', counted)
+    return calls
+
+def read_concurrently(readers=8):
+    snapshots = []
+    threads = [threading.Thread(target=lambda: snapshots.append(carousel.get_carousel())) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return snapshots
+
+def today():
+    return datetime.now().strftime('%Y-%m-%d')
+
+def test_concurrent_first_reads_build_once(rebuilds):
+    snapshots = read_concurrently()
+    assert len(rebuilds) == 1
+    assert len(snapshots) == 8 and all(snapshot['day'] == today() for snapshot in snapshots)
+
+def test_stale_snapshot_is_rebuilt_once_and_served_meanwhile(rebuilds):
+    carousel.refresh_carousel()
+    CarouselSnapshot.objects(key=carousel.HOME_KEY).update_one(set__day='2000-01-01')
+    del rebuilds[:]
+
+    read_concurrently()
+    assert len(rebuilds) == 1
+    assert CarouselSnapshot.objects(key=carousel.HOME_KEY).first().day == today()
+
+def test_held_lease_serves_the_stale_snapshot(rebuilds):
+    carousel.refresh_carousel()
+    CarouselSnapshot.objects(key=carousel.HOME_KEY).update_one(set__day='2000-01-01')
+    Lease(key=carousel.REBUILD_LEASE_KEY, expiresAt=datetime.now() + timedelta(minutes=1)).save()
+    del rebuilds[:]
+
+    assert carousel.get_carousel()['day'] == '2000-01-01'
+    assert not rebuilds
+
+def test_expired_lease_from_a_killed_reader_is_taken_over(rebuilds):
+    carousel.refresh_carousel()
+    CarouselSnapshot.objects(key=carousel.HOME_KEY).update_one(set__day='2000-01-01')
+    Lease(key=carousel.REBUILD_LEASE_KEY, expiresAt=datetime.now() - timedelta(seconds=1)).save()
+    del rebuilds[:]
+
+    assert carousel.get_carousel()['day'] == today()
+    assert len(rebuilds) == 1
+
+def test_failed_rebuild_keeps_the_old_day_and_frees_the_lease(rebuilds, monkeypatch):
+    carousel.refresh_carousel()
+    CarouselSnapshot.objects(key=carousel.HOME_KEY).update_one(set__day='2000-01-01')
+    def fail():
+        raise RuntimeError("database went away")
+    monkeypatch.setattr(carousel, 'refresh_carousel', fail)
+
+    assert carousel.get_carousel()['day'] == '2000-01-01'
+    assert CarouselSnapshot.objects(key=carousel.HOME_KEY).first().day == '2000-01-01'
+    assert Lease.objects(key=carousel.REBUILD_LEASE_KEY).count() == 0
+
+def test_items_leave_out_internal_fields(db):
+    upcoming = (datetime.now() + timedelta(days=3)).strftime('%b %d %Y')
+    sync_collection(AthleticsSchedule, [{
+        "date": upcoming, "time": "4:30 PM", "gender": "boys", "sport": "soccer", "level": "varsity",
+        "opponent": "Lane", "location": "Northside Prep", "home": True, "source": "https://example.com/schedule"
+    }], {})
+    item, = carousel.refresh_carousel()['items']
+    assert not {'contentHash', 'source', 'parsed_date'} & set(item)
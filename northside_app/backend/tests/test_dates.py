@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from models.dates import parse_date
+
+SCRAPED_IN_FALL = datetime(2025, 10, 18)
+
+def test_spring_date_scraped_in_the_fall_is_next_year():
+    assert parse_date("Fri, Jun 5", SCRAPED_IN_FALL) == datetime(2026, 6, 5)
+    assert parse_date("Jun 5", SCRAPED_IN_FALL) == datetime(2026, 6, 5)
+
+def test_fall_date_stays_in_the_current_school_year():
+    assert parse_date("Fri, Sep 5", SCRAPED_IN_FALL) == datetime(2025, 9, 5)
+    assert parse_date("Sep 5", datetime(2026, 3, 1)) == datetime(2025, 9, 5)
+
+def test_weekday_picks_the_year():
+    # Jun 5 was a Thursday in 2025
+    assert parse_date("Thu, Jun 5", SCRAPED_IN_FALL) == datetime(2025, 6, 5)
+
+def test_range_resolves_to_its_first_day():
+    assert parse_date("Fri, Sep 5 - Sat, Sep 6", SCRAPED_IN_FALL) == datetime(2025, 9, 5)
+
+def test_dates_with_a_year():
+    assert parse_date("Mar 01 2026") == datetime(2026, 3, 1)
+    assert parse_date("2026-03-01") == datetime(2026, 3, 1)
+    assert parse_date("TBD") is None
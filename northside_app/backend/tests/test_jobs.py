@@ -0,0 +1,21 @@
+import time
+from datetime import datetime
+
+from jobs import JobRunner
+from models.JobRun import JobRun
+
+HOUR = 60 * 60
+
+def test_jobs_without_history_run_right_away(db):
+    runner = JobRunner()
+    runner.add('roster', lambda: None, HOUR, jitter=60)
+    runner.first_runs()
+    assert runner.jobs[0].next_run <= time.time() + 60
+
+def test_jobs_with_history_wait_out_their_interval(db):
+    started = time.time() - 10 * 60
+    JobRun(name='roster', status='ok', startedAt=datetime.fromtimestamp(started)).save()
+    runner = JobRunner()
+    runner.add('roster', lambda: None, HOUR, jitter=60)
+    runner.first_runs()
+    assert started + HOUR <= runner.jobs[0].next_run <= started + HOUR + 60
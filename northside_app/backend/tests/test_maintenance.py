@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from maintenance import ensure_indexes
+from models.Announcement import Announcement
+
+def test_duplicates_are_removed_so_the_unique_index_builds(db):
+    collection = Announcement._get_collection()
+    key = {'start_date': 'Sep 5 2025', 'end_date': 'Sep 6 2025', 'title': 'Picture day', 'createdBy': 'Office'}
+    collection.insert_many([
+        dict(key, description='first', createdAt=datetime(2025, 9, 1)),
+        dict(key, description='edited', createdAt=datetime(2025, 9, 2)),
+        dict(key, title='Open house', description='other', createdAt=datetime(2025, 9, 1)),
+    ])
+
+    ensure_indexes()
+
+    assert sorted(doc['description'] for doc in collection.find()) == ['edited', 'other']
+    assert any(index.get('unique') for index in collection.index_information().values())
@@ -0,0 +1,33 @@
+from pagination import PageRequest, paginate
+from bson import json_util
+
+from models.AthleticsSchedule import AthleticsSchedule
+from ingest import sync_collection
+
+EVENT = {
+    "date": "Fri, Sep 5", "time": "4:30 PM", "gender": "girls", "sport": "soccer", "level": "varsity",
+    "opponent": "Lane", "location": "Northside Prep", "home": True,
+    "source": "https://www.northsideprepathletics.com/schedule?year=2025-2026"
+}
+
+def page(args):
+    body, _ = paginate(AthleticsSchedule.objects(), PageRequest(AthleticsSchedule, args, default_sort=('parsed_date',)))
+    return json_util.loads(body)
+
+def test_default_rows_leave_out_internal_fields(db):
+    sync_collection(AthleticsSchedule, [EVENT], {})
+    row, = page({})
+    assert set(row) == {'_id', 'date', 'time', 'gender', 'sport', 'level', 'opponent', 'location', 'home', 'createdAt'}
+
+def test_requested_fields_are_returned(db):
+    sync_collection(AthleticsSchedule, [EVENT], {})
+    row, = page({'fields': 'opponent,source'})
+    assert set(row) == {'_id', 'opponent', 'source'}
+
+def test_cursor_still_pages_on_an_internal_sort_key(db):
+    sync_collection(AthleticsSchedule, [dict(EVENT, opponent=name) for name in ['Lane', 'Payton', 'Whitney Young']], {})
+    body, cursor = paginate(AthleticsSchedule.objects(), PageRequest(AthleticsSchedule, {'limit': '2'}, default_sort=('parsed_date',)))
+    assert len(json_util.loads(body)) == 2 and cursor
+    rest = page({'limit': '2', 'cursor': cursor})
+    assert [row['opponent'] for row in rest] == ['Whitney Young']
+    assert 'parsed_date' not in rest[0]
@@ -0,0 +1,17 @@
+from scraping.trackandfield import matches_calendar
+
+MEETS = [{"name": "City Championship", "date": "Mar 01 2026", "location": "Lane"},
+         {"name": "Northside Invite", "date": "Mar 08 2026", "location": "Hanson Park"}]
+
+def test_same_count_as_the_calendar():
+    assert matches_calendar(MEETS, [], 2)
+
+def test_every_meet_named_on_a_card():
+    assert matches_calendar(MEETS, ["City Championship", "Northside Invite", "Northside Invite"], 3)
+
+def test_fewer_or_unrelated_meets_fall_back():
+    assert not matches_calendar(MEETS[:1], ["Relays"], 2)
+    assert not matches_calendar(MEETS, ["City Championship"], 1)
+
+def test_no_rendered_cards_falls_back():
+    assert not matches_calendar(MEETS, [], 0)